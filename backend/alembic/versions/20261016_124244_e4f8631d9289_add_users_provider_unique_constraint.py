@@ -0,0 +1,33 @@
+"""add_users_provider_unique_constraint
+
+Revision ID: e4f8631d9289
+Revises: 2e3bb46b4c8c
+Create Date: 2026-10-16 12:42:44.217118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f8631d9289'
+down_revision: Union[str, None] = '2e3bb46b4c8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Conflict target for INSERT ... ON CONFLICT in upsert_with_provider
+    op.create_unique_constraint(
+        'uq_users_auth_provider_provider_user_id',
+        'users',
+        ['auth_provider', 'provider_user_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'uq_users_auth_provider_provider_user_id', 'users', type_='unique'
+    )
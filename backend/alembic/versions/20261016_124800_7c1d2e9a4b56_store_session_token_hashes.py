@@ -0,0 +1,43 @@
+"""store_session_token_hashes
+
+Revision ID: 7c1d2e9a4b56
+Revises: e4f8631d9289
+Create Date: 2026-10-16 12:48:00.512634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1d2e9a4b56'
+down_revision: Union[str, None] = 'e4f8631d9289'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hash existing tokens in place so current cookies keep working
+    op.alter_column(
+        'sessions',
+        'token',
+        existing_type=sa.String(length=64),
+        type_=sa.LargeBinary(length=32),
+        existing_nullable=False,
+        postgresql_using="sha256(convert_to(token, 'UTF8'))",
+    )
+
+
+def downgrade() -> None:
+    # Raw tokens can't be recovered from their hashes: sign everyone out
+    op.execute("DELETE FROM sessions")
+    op.alter_column(
+        'sessions',
+        'token',
+        existing_type=sa.LargeBinary(length=32),
+        type_=sa.String(length=64),
+        existing_nullable=False,
+        postgresql_using="encode(token, 'hex')",
+    )
@@ -0,0 +1,38 @@
+"""cover_session_token_index
+
+Revision ID: b3f0a6c1d8e2
+Revises: 7c1d2e9a4b56
+Create Date: 2026-10-16 12:54:00.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f0a6c1d8e2'
+down_revision: Union[str, None] = '7c1d2e9a4b56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nothing filters on expires_at alone; it only cost a write per session
+    op.drop_index('ix_sessions_expires_at', table_name='sessions')
+    # Rebuild the unique token index to cover the columns token lookups read
+    op.drop_index('ix_sessions_token', table_name='sessions')
+    op.create_index(
+        'ix_sessions_token',
+        'sessions',
+        ['token'],
+        unique=True,
+        postgresql_include=['user_id', 'expires_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_token', table_name='sessions')
+    op.create_index('ix_sessions_token', 'sessions', ['token'], unique=True)
+    op.create_index('ix_sessions_expires_at', 'sessions', ['expires_at'], unique=False)
@@ -0,0 +1,29 @@
+"""add_reservoir_quick_hash
+
+Revision ID: 5a9c3e71f0d4
+Revises: b3f0a6c1d8e2
+Create Date: 2026-10-16 13:25:00.482617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9c3e71f0d4'
+down_revision: Union[str, None] = 'b3f0a6c1d8e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL; ingest treats them as dedup candidates
+    op.add_column('reservoir_documents', sa.Column('quick_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_reservoir_documents_quick_hash'), 'reservoir_documents', ['quick_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_reservoir_documents_quick_hash'), table_name='reservoir_documents')
+    op.drop_column('reservoir_documents', 'quick_hash')
@@ -0,0 +1,56 @@
+"""reservoir_user_scoped_indexes
+
+Revision ID: c81e4d2b7a63
+Revises: 5a9c3e71f0d4
+Create Date: 2026-10-16 13:35:00.917342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81e4d2b7a63'
+down_revision: Union[str, None] = '5a9c3e71f0d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reservoir queries always filter on user_id; replace the single-column
+    # indexes with composites led by it
+    op.drop_index('ix_reservoir_documents_user_id', table_name='reservoir_documents', if_exists=True)
+    op.drop_index('ix_reservoir_documents_content_hash', table_name='reservoir_documents', if_exists=True)
+    op.drop_index('ix_reservoir_documents_created_at', table_name='reservoir_documents', if_exists=True)
+    op.drop_index('ix_reservoir_documents_quick_hash', table_name='reservoir_documents')
+    # Unique, so concurrent ingests of the same file can't both be stored
+    op.create_index(
+        'ix_reservoir_documents_user_id_content_hash',
+        'reservoir_documents',
+        ['user_id', 'content_hash'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_reservoir_documents_user_id_quick_hash',
+        'reservoir_documents',
+        ['user_id', 'quick_hash'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_reservoir_documents_user_id_created_at',
+        'reservoir_documents',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservoir_documents_user_id_created_at', table_name='reservoir_documents')
+    op.drop_index('ix_reservoir_documents_user_id_quick_hash', table_name='reservoir_documents')
+    op.drop_index('ix_reservoir_documents_user_id_content_hash', table_name='reservoir_documents')
+    op.create_index('ix_reservoir_documents_quick_hash', 'reservoir_documents', ['quick_hash'], unique=False)
+    op.create_index('ix_reservoir_documents_created_at', 'reservoir_documents', ['created_at'], unique=False)
+    op.create_index('ix_reservoir_documents_content_hash', 'reservoir_documents', ['content_hash'], unique=False)
+    op.create_index('ix_reservoir_documents_user_id', 'reservoir_documents', ['user_id'], unique=False)
@@ -2,14 +2,13 @@
 Authentication dependencies for FastAPI routes.
 Provides get_current_user, get_required_user, and get_admin_user.
 """
-import uuid
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.base import get_db
+from database.base import get_async_db
 from database.crud import user_crud
 from models.auth import CurrentUser
 from auth.constants import SESSION_COOKIE_NAME
@@ -17,11 +16,16 @@ from core.logfire_config import log_error, log_info, log_warning
 
 # Setup header auth for Bearer token
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
+_BEARER_PREFIX = "Bearer "
+_BEARER_PREFIX_LEN = len(_BEARER_PREFIX)
 
+# request.state attribute holding the user resolved for the current request
+_REQUEST_USER_ATTR = "current_user"
 
-def get_current_user(
+
+async def get_current_user(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     authorization: Optional[str] = Depends(api_key_header),
 ) -> Optional[CurrentUser]:
     """
@@ -29,12 +33,30 @@ def get_current_user(
     
     This is a FastAPI dependency that can be used in route functions.
     Returns None if no valid session is found.
+
+    The result (including None for anonymous requests) is memoized on
+    request.state, so the token is resolved at most once per request even
+    when the dependency is reached through differently keyed sub-dependencies.
     """
+    if hasattr(request.state, _REQUEST_USER_ATTR):
+        return getattr(request.state, _REQUEST_USER_ATTR)
+
+    current_user = await _resolve_current_user(request, db, authorization)
+    setattr(request.state, _REQUEST_USER_ATTR, current_user)
+    return current_user
+
+
+async def _resolve_current_user(
+    request: Request,
+    db: AsyncSession,
+    authorization: Optional[str],
+) -> Optional[CurrentUser]:
+    """Resolve the session token on a request to a CurrentUser."""
     token = None
 
     # First try from Authorization header (Bearer token)
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.replace("Bearer ", "")
+    if authorization and authorization.startswith(_BEARER_PREFIX):
+        token = authorization[_BEARER_PREFIX_LEN:]
 
     # Then try from cookie
     if not token:
@@ -43,40 +65,41 @@ def get_current_user(
     if not token:
         return None
 
-    # Get session from database
-    db_session = user_crud.get_by_token(db=db, token=token)
-    if not db_session:
-        return None
-
-    # Get user from session
-    db_user = user_crud.get(db=db, id=db_session.user_id)
-    if not db_user or not db_user.is_active:
+    # Resolve session and user in one round trip
+    row = await user_crud.get_session_with_user(db=db, token=token)
+    if not row:
         return None
 
-    if not db_user.id:
+    if not row.id:
         log_error("User ID is missing in the database record")
         return None
 
-    id_as_uuid = uuid.UUID(str(db_user.id))
-
-    # Return CurrentUser model
-    return CurrentUser(
-        id=id_as_uuid,
-        email=str(db_user.email),
-        name=str(db_user.name) if db_user.name else None,
-        is_admin=bool(db_user.is_admin),
-        picture=str(db_user.picture) if db_user.picture else None,
-        is_email_verified=bool(db_user.is_email_verified),
-        is_active=bool(db_user.is_active),
+    # Columns are already typed by the driver (id is a uuid.UUID), so
+    # build the user without re-validating trusted database values
+    current_user = CurrentUser(
+        id=row.id,
+        email=row.email,
+        name=row.name or None,
+        is_admin=row.is_admin,
+        picture=row.picture or None,
+        is_email_verified=row.is_email_verified,
+        is_active=row.is_active,
     )
 
+    return current_user
+
 
 async def get_required_user(
-    current_user: Annotated[Optional[CurrentUser], Depends(get_current_user)]
+    current_user: Annotated[
+        Optional[CurrentUser], Depends(get_current_user, use_cache=True)
+    ]
 ) -> CurrentUser:
     """
     Require a logged-in user for protected routes.
     Raises 401 Unauthorized if no user is found.
+
+    Shares the per-request cached get_current_user result, so routes may
+    depend on both without resolving the session twice.
     """
     if not current_user:
         raise HTTPException(
@@ -88,7 +111,7 @@ async def get_required_user(
 
 
 async def get_admin_user(
-    current_user: Annotated[CurrentUser, Depends(get_required_user)]
+    current_user: Annotated[CurrentUser, Depends(get_required_user, use_cache=True)]
 ) -> CurrentUser:
     """
     Require an admin user for admin-only routes.
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from auth.utils import generate_verification_code, get_verification_code_expiry
 from core.logfire_config import log_error, log_info
-from helpers.email import load_email_template, send_email
+from helpers.email import render_email_template, send_email
 
 
 class EmailAuthClient:
@@ -25,14 +25,11 @@ class EmailAuthClient:
         try:
             subject = "Your 2.0Labs verification code"
 
-            html_template = load_email_template("verification_code.html")
-            html_content = html_template.replace(
-                "{{verification_code}}", verification_code
+            html_content = render_email_template(
+                "verification_code.html", verification_code=verification_code
             )
-
-            text_template = load_email_template("verification_code.txt")
-            text_content = text_template.replace(
-                "{{verification_code}}", verification_code
+            text_content = render_email_template(
+                "verification_code.txt", verification_code=verification_code
             )
 
             # Send the email using the existing email helper
@@ -1,9 +1,13 @@
 """
 Google OAuth2 client for authentication.
 """
-from typing import Dict, Optional
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, urlencode
 
-import requests
+import httpx
 
 from core.config import settings
 from core.logfire_config import log_error, log_info, log_warning
@@ -22,6 +26,32 @@ class GoogleAuthClient:
         self.token_url = "https://oauth2.googleapis.com/token"
         self.user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
 
+        # Everything except state is fixed, so encode the query once
+        self._base_auth_url = f"{self.auth_base_url}?" + urlencode({
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "response_type": "code",
+            "scope": "openid email profile",
+            "access_type": "offline",
+            "prompt": "consent",
+        })
+
+        # Pooled async HTTP client so OAuth calls reuse connections and
+        # don't block the event loop; closed via aclose() on shutdown
+        self._http = httpx.AsyncClient(
+            timeout=10.0,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=2,  # Connection-level retries only
+                limits=httpx.Limits(max_keepalive_connections=8),
+            ),
+        )
+
+        # Short-lived cache of user info keyed by (hashed) access token
+        self._user_info_cache: Dict[bytes, Tuple[OAuthUserInfo, float]] = {}
+        self._user_info_ttl = 60
+        self._user_info_lock = threading.Lock()
+
     def get_auth_url(self, state: str = "") -> str:
         """
         Generate the authorization URL for Google OAuth.
@@ -32,25 +62,11 @@ class GoogleAuthClient:
         Returns:
             str: The authorization URL
         """
-        params = {
-            "client_id": self.client_id,
-            "redirect_uri": self.redirect_uri,
-            "response_type": "code",
-            "scope": "openid email profile",
-            "access_type": "offline",
-            "prompt": "consent",
-        }
-
         if state:
-            params["state"] = state
-
-        # Build the URL with parameters
-        auth_url = (
-            f"{self.auth_base_url}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-        )
-        return auth_url
+            return f"{self._base_auth_url}&state={quote(state, safe='')}"
+        return self._base_auth_url
 
-    def get_token(self, code: str) -> Optional[Dict]:
+    async def get_token(self, code: str) -> Optional[Dict]:
         """
         Exchange the authorization code for tokens.
 
@@ -69,14 +85,14 @@ class GoogleAuthClient:
         }
 
         try:
-            response = requests.post(self.token_url, data=payload)
+            response = await self._http.post(self.token_url, data=payload)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             log_error("Error getting token from Google", error=e)
             return None
 
-    def get_user_info(self, access_token: str) -> Optional[OAuthUserInfo]:
+    async def get_user_info(self, access_token: str) -> Optional[OAuthUserInfo]:
         """
         Get user information using the access token.
 
@@ -86,28 +102,53 @@ class GoogleAuthClient:
         Returns:
             Optional[OAuthUserInfo]: The user information
         """
+        cache_key = hashlib.blake2b(access_token.encode(), digest_size=16).digest()
+        with self._user_info_lock:
+            cached = self._user_info_cache.get(cache_key)
+            if cached:
+                user_info, cached_at = cached
+                if time.monotonic() - cached_at < self._user_info_ttl:
+                    return user_info
+                del self._user_info_cache[cache_key]
+
         headers = {"Authorization": f"Bearer {access_token}"}
 
         try:
-            response = requests.get(self.user_info_url, headers=headers)
+            response = await self._http.get(self.user_info_url, headers=headers)
             response.raise_for_status()
             user_data = response.json()
 
             # Convert to our schema
-            return OAuthUserInfo(
+            user_info = OAuthUserInfo(
                 id=user_data["id"],
                 email=user_data["email"],
                 name=user_data.get("name"),
                 picture=user_data.get("picture"),
                 locale=user_data.get("locale"),
             )
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             log_error("Error getting user info from Google", error=e)
             return None
         except KeyError as e:
             log_error("Missing field in Google user info response", error=e)
             return None
 
+        with self._user_info_lock:
+            # Drop expired entries so the cache stays bounded
+            now = time.monotonic()
+            self._user_info_cache = {
+                k: v
+                for k, v in self._user_info_cache.items()
+                if now - v[1] < self._user_info_ttl
+            }
+            self._user_info_cache[cache_key] = (user_info, now)
+
+        return user_info
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self._http.aclose()
+
 
 # Create a singleton instance
 google_auth_client = GoogleAuthClient()
@@ -2,9 +2,14 @@
 Authentication utility functions.
 Cookie helpers, verification code generation, etc.
 """
-import random
-import string
+import base64
+import hmac
+import os
+import secrets
+import threading
+from collections import deque
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Literal
 
 from fastapi import Response
@@ -16,6 +21,47 @@ from core.config import settings
 SESSION_COOKIE_DOMAIN = settings.session.session_cookie_domain
 SECURE_COOKIES = settings.session.secure_cookies
 
+# Bound once; used on every verification attempt
+_compare_digest = hmac.compare_digest
+
+# OAuth state tokens are generated in batches: one urandom read per batch
+_OAUTH_STATE_BYTES = 32
+_OAUTH_STATE_BATCH = 256
+_oauth_states: deque[str] = deque()
+_oauth_states_lock = threading.Lock()
+
+# Locale-independent names for RFC 1123 dates
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = (
+    "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+    "Jul", "Aug", "Sep", "Oct", "Nov", "Dec",
+)
+
+
+@lru_cache(maxsize=256)
+def _http_date(epoch_seconds: int) -> str:
+    """Format a UTC epoch timestamp as an RFC 1123 date for cookie expiry."""
+    dt = datetime.fromtimestamp(epoch_seconds, timezone.utc)
+    return (
+        f"{_WEEKDAYS[dt.weekday()]}, {dt.day:02d} {_MONTHS[dt.month - 1]} {dt.year} "
+        f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d} GMT"
+    )
+
+
+@lru_cache(maxsize=8)
+def _session_cookie_attributes(
+    http_only: bool, same_site: Literal["lax", "strict", "none"]
+) -> str:
+    """Build the constant attribute suffix of the session Set-Cookie header."""
+    attributes = "; Path=/"
+    if SESSION_COOKIE_DOMAIN is not None:
+        attributes += f"; Domain={SESSION_COOKIE_DOMAIN}"
+    if SECURE_COOKIES:
+        attributes += "; Secure"
+    if http_only:
+        attributes += "; HttpOnly"
+    return f"{attributes}; SameSite={same_site}"
+
 
 def set_session_cookie(
     response: Response,
@@ -38,24 +84,22 @@ def set_session_cookie(
                    - Development (SECURE_COOKIES=False): "lax" for local development
     """
     # Calculate max_age in seconds
-    now = datetime.now(timezone.utc)
-    max_age = int((expires_at - now).total_seconds())
+    delta = expires_at - datetime.now(timezone.utc)
+    max_age = delta.days * 86400 + delta.seconds
 
     # Auto-determine SameSite: use "none" for cross-origin production, "lax" for local dev
     if same_site is None:
         same_site = "none" if SECURE_COOKIES else "lax"
 
-    response.set_cookie(
-        key=SESSION_COOKIE_NAME,
-        value=token,
-        max_age=max_age,  # seconds until expiration
-        expires=expires_at.strftime("%a, %d %b %Y %H:%M:%S GMT"),  # RFC format
-        domain=SESSION_COOKIE_DOMAIN,
-        path="/",
-        secure=SECURE_COOKIES,  # Only send over HTTPS
-        httponly=http_only,  # Not accessible via JavaScript
-        samesite=same_site,  # Controls cross-site sending
+    # Written directly rather than via response.set_cookie, which builds a
+    # SimpleCookie per call. Tokens are URL-safe base64, so need no quoting.
+    cookie = (
+        f"{SESSION_COOKIE_NAME}={token}"
+        f"; expires={_http_date(int(expires_at.timestamp()))}"
+        f"; Max-Age={max_age}"
+        f"{_session_cookie_attributes(http_only, same_site)}"
     )
+    response.raw_headers.append((b"set-cookie", cookie.encode("latin-1")))
 
 
 def clear_session_cookie(response: Response) -> None:
@@ -79,7 +123,33 @@ def generate_verification_code() -> str:
     Returns:
         str: A 6-digit numeric verification code
     """
-    return "".join(random.choices(string.digits, k=6))
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def generate_oauth_state() -> str:
+    """
+    Get a random, URL-safe state token for the OAuth flow.
+    Equivalent to secrets.token_urlsafe(32); tokens are taken from a
+    pre-generated pool that is refilled in batches.
+
+    Returns:
+        str: A single-use state token
+    """
+    while True:
+        try:
+            return _oauth_states.popleft()
+        except IndexError:
+            pass
+
+        with _oauth_states_lock:
+            if not _oauth_states:
+                raw = os.urandom(_OAUTH_STATE_BYTES * _OAUTH_STATE_BATCH)
+                _oauth_states.extend(
+                    base64.urlsafe_b64encode(raw[i:i + _OAUTH_STATE_BYTES])
+                    .rstrip(b"=")
+                    .decode("ascii")
+                    for i in range(0, len(raw), _OAUTH_STATE_BYTES)
+                )
 
 
 def is_verification_code_valid(
@@ -96,10 +166,9 @@ def is_verification_code_valid(
     Returns:
         bool: True if the code is still valid, False otherwise
     """
-    if not expires_at:
-        return False
-
-    if provided != actual:
+    if not expires_at or not _compare_digest(
+        (provided or "").encode(), (actual or "").encode()
+    ):
         return False
 
     return datetime.now(timezone.utc) < expires_at
@@ -2,20 +2,26 @@
 Application settings with validation.
 Required fields will raise ValidationError if not set in environment.
 """
+import os
 from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
 from dotenv import load_dotenv
-from pydantic import SecretStr
+from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Find and load .env file from backend/ or project root
+# Find and load .env file from backend/ or project root. Deployed environments
+# inject LOGFIRE_ENVIRONMENT themselves, so skip the file probe there unless
+# USE_DOTENV=1 forces it.
 _backend_dir = Path(__file__).parent.parent
-_env_file = _backend_dir / ".env"
-if not _env_file.exists():
-    _env_file = _backend_dir.parent / ".env"  # Try project root
-load_dotenv(_env_file if _env_file.exists() else None)
+if os.getenv("LOGFIRE_ENVIRONMENT", "local") == "local" or os.getenv("USE_DOTENV") == "1":
+    _env_file = next(
+        (p for p in (_backend_dir / ".env", _backend_dir.parent / ".env") if p.exists()),
+        None,
+    )
+    if _env_file:
+        load_dotenv(_env_file)
 
 
 class APIKeys(BaseSettings):
@@ -65,6 +71,14 @@ class Database(BaseSettings):
     
     database_url: str  # Required - will error if not set
 
+    # Async engine pool sizing (per worker process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # Seconds; stay under Supabase's idle disconnect
+    db_pool_timeout: int = 30
+    db_use_null_pool: bool = False  # Defer pooling to PgBouncer (transaction mode)
+    db_pool_warmup: bool = False  # Open db_pool_size connections at startup
+
 
 class Email(BaseSettings):
     """Email service settings."""
@@ -96,6 +110,16 @@ class LLM(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="", extra="ignore")
     
     llm_provider: str = "openai"
+    # Max concurrent extraction / schema-inference calls to the provider
+    llm_concurrency: int = 8
+
+
+class PDF(BaseSettings):
+    """PDF text extraction settings."""
+    model_config = SettingsConfigDict(env_prefix="PDF_", extra="ignore")
+    
+    backend: str = "pymupdf"  # "pymupdf" or "pypdfium2" (optional dependency)
+    workers: int = 2  # Extraction processes per server worker
 
 
 class Logfire(BaseSettings):
@@ -125,16 +149,17 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
     )
     
-    # Nested settings
-    api_keys: APIKeys = APIKeys()
-    google_oauth: GoogleOAuth = GoogleOAuth()
-    database: Database = Database()
-    email: Email = Email()
-    session: Session = Session()
-    chart: Chart = Chart()
-    llm: LLM = LLM()
-    logfire: Logfire = Logfire()
-    bucket: Bucket = Bucket()
+    # Nested settings (built lazily when Settings() is constructed)
+    api_keys: APIKeys = Field(default_factory=APIKeys)
+    google_oauth: GoogleOAuth = Field(default_factory=GoogleOAuth)
+    database: Database = Field(default_factory=Database)
+    email: Email = Field(default_factory=Email)
+    session: Session = Field(default_factory=Session)
+    chart: Chart = Field(default_factory=Chart)
+    llm: LLM = Field(default_factory=LLM)
+    pdf: PDF = Field(default_factory=PDF)
+    logfire: Logfire = Field(default_factory=Logfire)
+    bucket: Bucket = Field(default_factory=Bucket)
     
     # App settings
     client_domain: str = "http://localhost:5173"
@@ -44,7 +44,6 @@ def get_logger():
 
 def instrument_fastapi(app):
     """Instrument FastAPI application with Logfire"""
-    logger = get_logger()
     logger.instrument_fastapi(
         app,
         capture_headers=True,
@@ -52,33 +51,41 @@ def instrument_fastapi(app):
     )
 
 
+class _LazyLogger:
+    """
+    Stand-in for the logfire module that configures logfire on first use,
+    so importing this module has no side effects. Each attribute is looked
+    up once and then kept on the instance.
+    """
+
+    def __getattr__(self, name):
+        value = getattr(get_logger(), name)
+        setattr(self, name, value)
+        return value
+
+
+logger = _LazyLogger()
+
+
 def log_info(message: str, **kwargs):
-    logger = get_logger()
     logger.info(message, **kwargs)
 
 
 def log_debug(message: str, **kwargs):
-    logger = get_logger()
     logger.debug(message, **kwargs)
 
 
 def log_warning(message: str, **kwargs):
-    logger = get_logger()
     logger.warning(message, **kwargs)
 
 
 def log_error(message: str, error: Optional[Exception] = None, **kwargs):
-    logger = get_logger()
     if error:
-        kwargs["error"] = str(error)
-        kwargs["error_type"] = error.__class__.__name__
-    logger.error(message, **kwargs)
+        # Let logfire record the exception and traceback natively
+        logger.exception(message, _exc_info=error, **kwargs)
+    else:
+        logger.error(message, **kwargs)
 
 
 def log_critical(message: str, **kwargs):
-    logger = get_logger()
     logger.critical(message, **kwargs)
-
-
-logger = get_logger()
-
@@ -1,37 +1,185 @@
 """
 Database connection and session management for Supabase PostgreSQL.
 """
-from typing import Generator
+import asyncio
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from typing import AsyncGenerator, Generator, Optional, Tuple
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import NullPool
 
 from core.config import settings
 
 # Get database URL from settings (validated by pydantic)
 DATABASE_URL = settings.database.database_url
 
-# Create SQLAlchemy engine
+
+def _pool_options() -> dict:
+    """Async engine pool options derived from settings."""
+    db_settings = settings.database
+    if db_settings.db_use_null_pool:
+        # External pooler (e.g. PgBouncer) owns the connections
+        return {"poolclass": NullPool}
+    return {
+        "pool_pre_ping": True,  # Enable connection health checks
+        "pool_size": db_settings.db_pool_size,
+        "max_overflow": db_settings.db_max_overflow,
+        "pool_recycle": db_settings.db_pool_recycle,
+        "pool_timeout": db_settings.db_pool_timeout,
+        "pool_use_lifo": True,  # Keep a small set of warm connections
+    }
+
+
+# Sync engine for scripts and maintenance tasks; request handlers use the
+# async engine, so this one keeps a minimal pool
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_size=5,
-    max_overflow=10,
+    insertmanyvalues_page_size=1000,  # Batch size for multi-row INSERT ... RETURNING
+    **(
+        {"poolclass": NullPool}
+        if settings.database.db_use_null_pool
+        else {"pool_pre_ping": True, "pool_size": 5, "max_overflow": 10}
+    ),
+)
+
+# Create session factory. Objects are not expired on commit: server-generated
+# values come back through RETURNING (see Base.__mapper_args__).
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+
+# Hosts and ports of transaction-mode poolers (Supabase's PgBouncer/Supavisor)
+_POOLER_HOST_SUFFIX = ".pooler.supabase.com"
+_POOLER_PORT = 6543
+
+
+def _async_engine_args(url: str) -> Tuple[URL, dict]:
+    """
+    Rewrite a sync PostgreSQL URL for the asyncpg driver.
+
+    asyncpg rejects libpq query parameters, so sslmode is moved into
+    connect_args. Behind a transaction-mode pooler, a connection can change
+    between statements, so asyncpg's prepared statement caches are turned off.
+
+    Returns:
+        The asyncpg URL and the connect_args for create_async_engine
+    """
+    sync_url = make_url(url)
+    query = dict(sync_url.query)
+    connect_args: dict = {}
+
+    sslmode = query.pop("sslmode", None)
+    if sslmode:
+        # asyncpg accepts libpq sslmode names for ssl
+        connect_args["ssl"] = sslmode
+
+    behind_pooler = (
+        settings.database.db_use_null_pool
+        or (sync_url.host or "").endswith(_POOLER_HOST_SUFFIX)
+        or sync_url.port == _POOLER_PORT
+    )
+    if behind_pooler:
+        query["prepared_statement_cache_size"] = "0"
+        connect_args["statement_cache_size"] = 0
+        # Unique names, so a statement prepared on another client's server
+        # connection can't collide
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+
+    async_url = sync_url.set(drivername="postgresql+asyncpg", query=query)
+    return async_url, connect_args
+
+
+# Async engine for hot paths that should not block the event loop
+_async_url, _async_connect_args = _async_engine_args(DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url, connect_args=_async_connect_args, **_pool_options()
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562) for primary keys.
+    The leading 48 bits are a millisecond timestamp, so new rows land at the
+    right edge of the btree index instead of on random pages.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76  # version
+        | (rand >> 62 & 0xFFF) << 64  # rand_a
+        | 0b10 << 62  # variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF  # rand_b
+    )
+    return uuid.UUID(int=value)
 
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
-    pass
+
+    # Fetch server-generated columns (created_at, onupdate updated_at) with
+    # RETURNING in the same INSERT/UPDATE, so rows never need a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+
+class _RequestSession:
+    """Mutable holder for the session shared by one request."""
+
+    __slots__ = ("session",)
+
+    def __init__(self) -> None:
+        self.session: Optional[AsyncSession] = None
+
+
+# Set by DBSessionMiddleware for the lifetime of each HTTP request. The holder
+# is mutable so a session opened inside a dependency (which may run in a
+# copied context) is still visible to the middleware for cleanup.
+_request_session: ContextVar[Optional[_RequestSession]] = ContextVar(
+    "db_session", default=None
+)
+
+
+class DBSessionMiddleware:
+    """
+    ASGI middleware that scopes one database session to each HTTP request.
+    Every Depends(get_async_db) in the request reuses it; it's closed once
+    the response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        holder = _RequestSession()
+        reset_token = _request_session.set(holder)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if holder.session is not None:
+                await holder.session.close()
+            _request_session.reset(reset_token)
 
 
 def get_db() -> Generator[Session, None, None]:
     """
-    Dependency that provides a database session.
-    Yields a session and ensures it's closed after use.
+    Dependency that provides a synchronous database session.
+    For scripts and maintenance tasks; request handlers use get_async_db.
     """
     db = SessionLocal()
     try:
@@ -40,6 +188,44 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides an async database session.
+    Inside a request the session is shared and closed by DBSessionMiddleware;
+    otherwise a fresh session is yielded and closed after use.
+    """
+    holder = _request_session.get()
+    if holder is not None:
+        if holder.session is None:
+            holder.session = AsyncSessionLocal()
+        yield holder.session
+        return
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def _warm_up_async_connection() -> None:
+    """Open one async connection and return it to the pool."""
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_up_pools() -> None:
+    """
+    Pre-open db_pool_size connections on the async engine, if enabled.
+    Called from the app lifespan so the first requests don't pay for
+    connection setup (TCP + TLS + auth).
+    """
+    db_settings = settings.database
+    if db_settings.db_use_null_pool or not db_settings.db_pool_warmup:
+        return
+
+    await asyncio.gather(
+        *(_warm_up_async_connection() for _ in range(db_settings.db_pool_size))
+    )
+
+
 def init_db() -> None:
     """
     Initialize the database by creating all tables.
@@ -2,288 +2,534 @@
 CRUD operations for User and Session models.
 """
 import datetime
+import hashlib
 import secrets
-import uuid
-from typing import Optional
+from typing import Optional, Type, TypeVar
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, lambda_stmt, literal_column, or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 
+from database.base import uuid7
 from database.models import User, Session as DBSession, Template
 from models.auth import UserCreateWithProvider, UserUpdate
 from core.logfire_config import log_error, log_info, log_warning
 
 
+ModelT = TypeVar("ModelT")
+
+
+async def _insert_returning(
+    db: AsyncSession, model: Type[ModelT], rows: list[dict]
+) -> list[ModelT]:
+    """
+    Insert rows in one INSERT ... RETURNING and commit.
+    RETURNING populates server defaults (id, created_at), so no refresh is needed.
+    """
+    stmt = insert(model).returning(model, sort_by_parameter_order=True)
+    objs = list(await db.scalars(stmt, rows))
+    await db.commit()
+    return objs
+
+
+def _hash_token(token: str) -> bytes:
+    """SHA-256 digest of a raw session token, as stored in sessions.token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+# Field names resolved once instead of via model_dump() on every call
+_USER_CREATE_FIELDS = tuple(UserCreateWithProvider.model_fields)
+_UPSERT_UPDATE_FIELDS = tuple(
+    field for field in _USER_CREATE_FIELDS
+    if field not in {"auth_provider", "provider_user_id"}
+)
+
+
 class CRUDUser:
-    """CRUD operations for User model."""
+    """
+    CRUD operations for User model.
 
-    def get(self, db: Session, *, id: UUID) -> Optional[User]:
+    Point lookups on the request path are built with lambda_stmt, so the
+    statement is constructed and compiled once per call site and later
+    calls only bind new parameter values.
+    """
+
+    async def get(self, db: AsyncSession, *, id: UUID) -> Optional[User]:
         """Get a user by ID."""
-        return db.query(User).filter(User.id == id).first()
+        stmt = lambda_stmt(lambda: select(User).where(User.id == id).limit(1))
+        return (await db.scalars(stmt)).first()
+
+    async def get_with_templates(self, db: AsyncSession, *, id: UUID) -> Optional[User]:
+        """
+        Get a user with their templates (and each template's fork source)
+        and sessions loaded.
+
+        selectinload issues one IN query per relationship, so the number of
+        queries stays constant however many children the user has, without
+        the row duplication a JOIN-based eager load would cause.
+        """
+        stmt = (
+            select(User)
+            .options(
+                selectinload(User.templates).selectinload(Template.forked_from),
+                selectinload(User.sessions),
+            )
+            .where(User.id == id)
+        )
+        return (await db.scalars(stmt)).first()
 
-    def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         """Get a user by email."""
-        return db.query(User).filter(User.email == email).first()
+        stmt = lambda_stmt(
+            lambda: select(User).where(User.email == email).limit(1)
+        )
+        return (await db.scalars(stmt)).first()
 
-    def get_by_provider_id(
-        self, db: Session, *, provider: str, provider_user_id: str
+    async def get_by_provider_id(
+        self, db: AsyncSession, *, provider: str, provider_user_id: str
     ) -> Optional[User]:
         """Get a user by provider and provider's user ID."""
-        return (
-            db.query(User)
-            .filter(
+        stmt = lambda_stmt(
+            lambda: select(User)
+            .where(
                 User.auth_provider == provider,
                 User.provider_user_id == provider_user_id,
             )
-            .first()
+            .limit(1)
         )
+        return (await db.scalars(stmt)).first()
 
-    def get_by_email_and_provider(
-        self, db: Session, *, email: str, provider: str = "email"
+    async def get_by_email_and_provider(
+        self, db: AsyncSession, *, email: str, provider: str = "email"
     ) -> Optional[User]:
         """Get a user by email and specific auth provider."""
-        return (
-            db.query(User)
-            .filter(User.email == email, User.auth_provider == provider)
-            .first()
+        stmt = lambda_stmt(
+            lambda: select(User)
+            .where(User.email == email, User.auth_provider == provider)
+            .limit(1)
         )
+        return (await db.scalars(stmt)).first()
 
-    def create_with_provider(
-        self, db: Session, *, obj_in: UserCreateWithProvider
+    async def create_with_provider(
+        self, db: AsyncSession, *, obj_in: UserCreateWithProvider
     ) -> User:
         """Create a new user from OAuth provider data."""
-        db_obj = User(
-            email=obj_in.email,
-            name=obj_in.name,
-            picture=obj_in.picture,
-            auth_provider=obj_in.auth_provider,
-            provider_user_id=obj_in.provider_user_id,
-            locale=obj_in.locale,
-            is_email_verified=obj_in.is_email_verified,
-            is_active=True,
-            is_admin=False,
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
-
-    def upsert_with_provider(
-        self, db: Session, *, obj_in: UserCreateWithProvider
+        users = await _insert_returning(db, User, [{
+            "email": obj_in.email,
+            "name": obj_in.name,
+            "picture": obj_in.picture,
+            "auth_provider": obj_in.auth_provider,
+            "provider_user_id": obj_in.provider_user_id,
+            "locale": obj_in.locale,
+            "is_email_verified": obj_in.is_email_verified,
+            "is_active": True,
+            "is_admin": False,
+        }])
+        return users[0]
+
+    async def upsert_with_provider(
+        self, db: AsyncSession, *, obj_in: UserCreateWithProvider
     ) -> tuple[User, bool]:
         """
         Create or update a user from OAuth provider data.
         If user exists (by provider ID), update their info.
+        If the email belongs to another provider, link it to this one.
         If not, create new user.
-        
+
         Returns:
             tuple[User, bool]: (user, newly_created)
         """
-        # First try to find by provider ID
-        db_user = self.get_by_provider_id(
-            db, provider=obj_in.auth_provider, provider_user_id=obj_in.provider_user_id
-        )
-
         # Since OAuth providers verify email, we can mark email as verified
         obj_in.is_email_verified = True
 
-        # If exists, update info
-        if db_user:
-            update_data = obj_in.model_dump(
-                exclude={"auth_provider", "provider_user_id"}
+        # Insert, or update the existing row for this provider identity, in a
+        # single round trip. xmax is 0 only for freshly inserted rows.
+        values = {field: getattr(obj_in, field) for field in _USER_CREATE_FIELDS}
+        values["is_active"] = True
+        values["is_admin"] = False
+        update_values = {}
+        for field in _UPSERT_UPDATE_FIELDS:
+            value = getattr(obj_in, field)
+            if value is not None:
+                update_values[field] = value
+
+        insert_stmt = pg_insert(User).values(**values)
+        excluded = insert_stmt.excluded
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[User.auth_provider, User.provider_user_id],
+            set_={**update_values, "updated_at": func.now()},
+            # Only rewrite the row (and its WAL) when something changed
+            where=or_(*(
+                getattr(User, field).is_distinct_from(excluded[field])
+                for field in update_values
+            )),
+        ).returning(User, (literal_column("xmax") == 0).label("inserted"))
+
+        try:
+            result = await db.execute(
+                stmt, execution_options={"populate_existing": True}
             )
-            for field, value in update_data.items():
-                if value is not None:
-                    setattr(db_user, field, value)
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+            row = result.one_or_none()
+            await db.commit()
+        except IntegrityError:
+            # Email is already registered under a different provider
+            await db.rollback()
+            db_user = await self._link_provider(db, obj_in=obj_in)
+            if not db_user:
+                raise
             return db_user, False
 
-        # If not found by provider ID, check email (might have registered with another provider)
-        db_user = self.get_by_email(db, email=obj_in.email)
-        if db_user:
-            # User exists with this email but different provider
-            log_info(
-                "User with email already exists with different provider",
-                email=obj_in.email,
-                existing_provider=db_user.auth_provider,
-                new_provider=obj_in.auth_provider
+        if row is None:
+            # Conflict with nothing to update: the stored row is current
+            db_user = await self.get_by_provider_id(
+                db,
+                provider=obj_in.auth_provider,
+                provider_user_id=obj_in.provider_user_id,
             )
-            # Update user with new provider info
-            db_user.auth_provider = obj_in.auth_provider
-            db_user.provider_user_id = obj_in.provider_user_id
-            db_user.name = obj_in.name or db_user.name
-            db_user.picture = obj_in.picture or db_user.picture
-            db_user.locale = obj_in.locale or db_user.locale
-            db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
             return db_user, False
 
-        # Create new user if not found
-        db_user = self.create_with_provider(db, obj_in=obj_in)
-        return db_user, True
+        db_user, newly_created = row
+        if not newly_created:
+            log_info("Updated OAuth user profile", user_id=str(db_user.id))
+        return db_user, bool(newly_created)
 
-    def create_email_user(
-        self, db: Session, *, email: str, name: Optional[str] = None
+    async def _link_provider(
+        self, db: AsyncSession, *, obj_in: UserCreateWithProvider
+    ) -> Optional[User]:
+        """Move an existing user (matched by email) onto a new auth provider."""
+        db_user = await self.get_by_email(db, email=obj_in.email)
+        if not db_user:
+            return None
+
+        # User exists with this email but different provider
+        log_info(
+            "User with email already exists with different provider",
+            email=obj_in.email,
+            existing_provider=db_user.auth_provider,
+            new_provider=obj_in.auth_provider
+        )
+        # Update user with new provider info
+        db_user.auth_provider = obj_in.auth_provider
+        db_user.provider_user_id = obj_in.provider_user_id
+        db_user.name = obj_in.name or db_user.name
+        db_user.picture = obj_in.picture or db_user.picture
+        db_user.locale = obj_in.locale or db_user.locale
+        db.add(db_user)
+        await db.commit()
+        return db_user
+
+    async def create_email_user(
+        self, db: AsyncSession, *, email: str, name: Optional[str] = None
     ) -> User:
         """Create a new user for email authentication."""
-        db_obj = User(
+        users = await _insert_returning(db, User, [{
+            "email": email,
+            "name": name,
+            "auth_provider": "email",
+            "provider_user_id": email,  # Use email as provider_user_id for email auth
+            "is_active": True,
+            "is_admin": False,
+            "is_email_verified": False,  # Not verified initially
+        }])
+        return users[0]
+
+    async def upsert_email_verification_code(
+        self,
+        db: AsyncSession,
+        *,
+        email: str,
+        code: str,
+        expires_at: datetime.datetime,
+    ) -> tuple[Optional[User], bool]:
+        """
+        Store a new verification code for an email user, creating the user
+        if needed, in a single INSERT ... ON CONFLICT round trip.
+        Emails registered under another provider are left untouched.
+
+        Returns:
+            tuple[Optional[User], bool]: (user, newly_created); user is None
+            if the email belongs to a different auth provider
+        """
+        insert_stmt = pg_insert(User).values(
             email=email,
-            name=name,
             auth_provider="email",
             provider_user_id=email,  # Use email as provider_user_id for email auth
             is_active=True,
             is_admin=False,
             is_email_verified=False,  # Not verified initially
+            email_verification_token=code,
+            email_verification_expires_at=expires_at,
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        excluded = insert_stmt.excluded
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            set_={
+                "email_verification_token": excluded.email_verification_token,
+                "email_verification_expires_at": excluded.email_verification_expires_at,
+                "updated_at": func.now(),
+            },
+            where=User.auth_provider == "email",
+        ).returning(User, (literal_column("xmax") == 0).label("inserted"))
+
+        result = await db.execute(
+            stmt, execution_options={"populate_existing": True}
+        )
+        row = result.one_or_none()
+        await db.commit()
 
-    def update(
-        self, db: Session, *, db_obj: User, obj_in: UserUpdate
+        if row is None:
+            return None, False
+
+        db_user, newly_created = row
+        return db_user, bool(newly_created)
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: User, obj_in: UserUpdate
     ) -> User:
         """Update a user."""
-        update_data = obj_in.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_obj, field, value)
+        # Only fields explicitly set on the request
+        for field in obj_in.model_fields_set:
+            setattr(db_obj, field, getattr(obj_in, field))
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
         return db_obj
 
-    def update_verification_code(
-        self, db: Session, *, user: User, code: str, expires_at: datetime.datetime
+    async def update_verification_code(
+        self, db: AsyncSession, *, user: User, code: str, expires_at: datetime.datetime
     ) -> User:
         """Update user's verification code and expiry."""
         user.email_verification_token = code
         user.email_verification_expires_at = expires_at
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
         return user
 
-    def verify_email(self, db: Session, *, user: User) -> User:
+    async def verify_email(self, db: AsyncSession, *, user: User) -> User:
         """Mark user's email as verified and clear verification code."""
         user.is_email_verified = True
         user.email_verification_token = None
         user.email_verification_expires_at = None
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
         return user
 
     # ============= Session Management =============
 
-    def create_session(
+    async def create_session(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: UUID,
         user_agent: Optional[str] = None,
         ip_address: Optional[str] = None,
         expires_in_days: int = 30,
-    ) -> DBSession:
-        """Create a new session for a user."""
-        token = secrets.token_hex(32)  # 64 characters
+    ) -> tuple[DBSession, str]:
+        """
+        Create a new session for a user.
+        Only the token's hash is stored.
+
+        Returns:
+            tuple[DBSession, str]: (session, raw token for the cookie)
+        """
+        token = secrets.token_urlsafe(32)  # 43 characters
         expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
             days=expires_in_days
         )
 
-        session = DBSession(
-            id=uuid.uuid4(),
-            user_id=user_id,
-            token=token,
-            expires_at=expires_at,
-            user_agent=user_agent,
-            ip_address=ip_address,
+        sessions = await _insert_returning(db, DBSession, [{
+            "id": uuid7(),
+            "user_id": user_id,
+            "token": _hash_token(token),
+            "expires_at": expires_at,
+            "user_agent": user_agent,
+            "ip_address": ip_address,
+        }])
+        return sessions[0], token
+
+    async def get_by_token(self, db: AsyncSession, *, token: str) -> Optional[DBSession]:
+        """
+        Get session by token.
+
+        Not cached: a revocation in another worker process must take
+        effect on the next lookup. Expiry is checked against the database
+        clock.
+        """
+        token_hash = _hash_token(token)
+        stmt = lambda_stmt(
+            lambda: select(DBSession)
+            .where(DBSession.token == token_hash, DBSession.expires_at > func.now())
+            .limit(1)
+        )
+        return (await db.scalars(stmt)).first()
+
+    async def get_token_claims(self, db: AsyncSession, *, token: str):
+        """
+        Get the user_id and expires_at of an active session.
+
+        Selects plain columns (served from the covering token index), so no
+        ORM Session object is built or added to the identity map.
+
+        Returns:
+            Row with user_id and expires_at, or None if missing or expired
+        """
+        token_hash = _hash_token(token)
+        stmt = lambda_stmt(
+            lambda: select(DBSession.user_id, DBSession.expires_at)
+            .where(DBSession.token == token_hash, DBSession.expires_at > func.now())
+            .limit(1)
         )
+        result = await db.execute(stmt)
+        return result.first()
+
+    async def get_session_with_user(self, db: AsyncSession, *, token: str):
+        """
+        Resolve an active session and its user in a single query.
 
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-        return session
-
-    def get_by_token(self, db: Session, *, token: str) -> Optional[DBSession]:
-        """Get session by token."""
-        now = datetime.datetime.now(datetime.timezone.utc)
-        session = (
-            db.query(DBSession)
-            .filter(DBSession.token == token, DBSession.expires_at > now)
-            .first()
+        Returns a row with the user columns needed by CurrentUser plus the
+        session's expires_at, or None if the session is missing, expired,
+        or belongs to an inactive user.
+        """
+        stmt = (
+            select(
+                User.id,
+                User.email,
+                User.name,
+                User.is_admin,
+                User.picture,
+                User.is_email_verified,
+                User.is_active,
+                DBSession.expires_at,
+            )
+            .join(User, User.id == DBSession.user_id)
+            .where(
+                DBSession.token == _hash_token(token),
+                DBSession.expires_at > func.now(),
+                User.is_active == True,
+            )
+            .limit(1)
         )
-        return session
+        result = await db.execute(stmt)
+        return result.first()
 
-    def revoke_session(self, db: Session, *, token: str) -> bool:
+    async def revoke_session(self, db: AsyncSession, *, token: str) -> bool:
         """Revoke (delete) a session."""
-        session = db.query(DBSession).filter(DBSession.token == token).first()
+        token_hash = _hash_token(token)
+        stmt = lambda_stmt(
+            lambda: select(DBSession).where(DBSession.token == token_hash).limit(1)
+        )
+        session = (await db.scalars(stmt)).first()
         if session:
-            db.delete(session)
-            db.commit()
+            await db.delete(session)
+            await db.commit()
             return True
         return False
 
-    def revoke_all_sessions(self, db: Session, *, user_id: UUID) -> int:
+    async def revoke_all_sessions(self, db: AsyncSession, *, user_id: UUID) -> int:
         """Revoke all sessions for a user."""
-        result = db.query(DBSession).filter(DBSession.user_id == user_id).delete()
-        db.commit()
-        return result
+        # Bulk DELETE on the user_id index; skip reconciling the identity map
+        result = await db.execute(
+            delete(DBSession)
+            .where(DBSession.user_id == user_id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+
+# Every Template column except metrics, for list views
+_TEMPLATE_SUMMARY_COLUMNS = (
+    Template.id,
+    Template.name,
+    Template.subtitle,
+    Template.description,
+    Template.user_id,
+    Template.is_system,
+    Template.forked_from_id,
+    Template.created_at,
+    Template.updated_at,
+)
 
 
 class CRUDTemplate:
     """CRUD operations for Template model."""
 
-    def get(self, db: Session, *, id: UUID) -> Optional[Template]:
+    async def get(self, db: AsyncSession, *, id: UUID) -> Optional[Template]:
         """Get a template by ID."""
-        return db.query(Template).filter(Template.id == id).first()
+        stmt = select(Template).where(Template.id == id).limit(1)
+        return (await db.scalars(stmt)).first()
 
-    def get_all_for_user(self, db: Session, *, user_id: Optional[UUID] = None) -> list[Template]:
+    async def get_all_for_user(
+        self, db: AsyncSession, *, user_id: Optional[UUID] = None
+    ) -> list[Template]:
         """
         Get all templates available to a user.
         Returns system templates + user's own templates.
         """
         if user_id:
-            return (
-                db.query(Template)
-                .filter(
-                    (Template.is_system == True) | (Template.user_id == user_id)
-                )
-                .order_by(Template.is_system.desc(), Template.created_at.asc())
-                .all()
+            # UNION ALL of two indexed lookups instead of an OR across columns,
+            # which Postgres tends to plan as a sequential scan
+            combined = union_all(
+                select(Template).where(Template.is_system == True),
+                select(Template).where(
+                    Template.user_id == user_id, Template.is_system == False
+                ),
+            ).subquery()
+            template = aliased(Template, combined)
+            stmt = select(template).order_by(
+                template.is_system.desc(), template.created_at.asc()
             )
+            return list(await db.scalars(stmt))
         else:
             # Only system templates for unauthenticated users
-            return (
-                db.query(Template)
-                .filter(Template.is_system == True)
-                .order_by(Template.created_at.asc())
-                .all()
+            return await self.get_system_templates(db)
+
+    async def get_summaries_for_user(
+        self, db: AsyncSession, *, user_id: Optional[UUID] = None
+    ) -> list:
+        """
+        Same rows as get_all_for_user, without the metrics JSONB.
+        For list views that don't render metrics; returns column Rows.
+        """
+        system_templates = select(*_TEMPLATE_SUMMARY_COLUMNS).where(
+            Template.is_system == True
+        )
+        if user_id:
+            user_templates = select(*_TEMPLATE_SUMMARY_COLUMNS).where(
+                Template.user_id == user_id, Template.is_system == False
             )
+            combined = union_all(system_templates, user_templates).subquery()
+            stmt = select(combined).order_by(
+                combined.c.is_system.desc(), combined.c.created_at.asc()
+            )
+        else:
+            stmt = system_templates.order_by(Template.created_at.asc())
+        result = await db.execute(stmt)
+        return list(result)
 
-    def get_system_templates(self, db: Session) -> list[Template]:
+    async def get_system_templates(self, db: AsyncSession) -> list[Template]:
         """Get all system templates."""
-        return (
-            db.query(Template)
-            .filter(Template.is_system == True)
+        stmt = (
+            select(Template)
+            .where(Template.is_system == True)
             .order_by(Template.created_at.asc())
-            .all()
         )
+        return list(await db.scalars(stmt))
 
-    def get_user_templates(self, db: Session, *, user_id: UUID) -> list[Template]:
+    async def get_user_templates(self, db: AsyncSession, *, user_id: UUID) -> list[Template]:
         """Get all templates owned by a user."""
-        return (
-            db.query(Template)
-            .filter(Template.user_id == user_id)
+        stmt = (
+            select(Template)
+            .where(Template.user_id == user_id)
             .order_by(Template.created_at.desc())
-            .all()
         )
+        return list(await db.scalars(stmt))
 
-    def create(
+    async def create(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         name: str,
         user_id: UUID,
@@ -293,50 +539,53 @@ class CRUDTemplate:
         forked_from_id: Optional[UUID] = None,
     ) -> Template:
         """Create a new user-owned template."""
-        db_obj = Template(
-            name=name,
-            subtitle=subtitle,
-            description=description,
-            metrics=metrics or [],
-            user_id=user_id,
-            is_system=False,
-            forked_from_id=forked_from_id,
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        templates = await self.create_many(db, rows=[{
+            "name": name,
+            "subtitle": subtitle,
+            "description": description,
+            "metrics": metrics or [],
+            "user_id": user_id,
+            "is_system": False,
+            "forked_from_id": forked_from_id,
+        }])
+        return templates[0]
+
+    async def create_many(self, db: AsyncSession, *, rows: list[dict]) -> list[Template]:
+        """
+        Create several templates in a single INSERT ... RETURNING.
+        Each row is a dict of Template column values.
+        """
+        if not rows:
+            return []
+        return await _insert_returning(db, Template, rows)
 
-    def fork(
+    async def fork(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         template_id: UUID,
         user_id: UUID,
         new_name: Optional[str] = None,
     ) -> Optional[Template]:
         """Fork an existing template for a user."""
-        source = self.get(db, id=template_id)
+        source = await self.get(db, id=template_id)
         if not source:
             return None
-        
-        forked = Template(
-            name=new_name or f"{source.name} (Copy)",
-            subtitle=source.subtitle,
-            description=source.description,
-            metrics=source.metrics.copy() if source.metrics else [],
-            user_id=user_id,
-            is_system=False,
-            forked_from_id=template_id,
-        )
-        db.add(forked)
-        db.commit()
-        db.refresh(forked)
-        return forked
 
-    def update(
+        templates = await self.create_many(db, rows=[{
+            "name": new_name or f"{source.name} (Copy)",
+            "subtitle": source.subtitle,
+            "description": source.description,
+            "metrics": source.metrics.copy() if source.metrics else [],
+            "user_id": user_id,
+            "is_system": False,
+            "forked_from_id": template_id,
+        }])
+        return templates[0]
+
+    async def update(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         db_obj: Template,
         name: Optional[str] = None,
@@ -353,18 +602,17 @@ class CRUDTemplate:
             db_obj.description = description
         if metrics is not None:
             db_obj.metrics = metrics
-        
+
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
         return db_obj
 
-    def delete(self, db: Session, *, db_obj: Template) -> bool:
+    async def delete(self, db: AsyncSession, *, db_obj: Template) -> bool:
         """Delete a template (only if user-owned)."""
         if db_obj.is_system:
             return False
-        db.delete(db_obj)
-        db.commit()
+        await db.delete(db_obj)
+        await db.commit()
         return True
 
     def can_modify(self, template: Template, user_id: UUID) -> bool:
@@ -375,4 +623,3 @@ class CRUDTemplate:
 # Create singleton instances
 user_crud = CRUDUser()
 template_crud = CRUDTemplate()
-
@@ -2,7 +2,6 @@
 SQLAlchemy models for User and Session.
 Compatible with Supabase PostgreSQL.
 """
-import uuid
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -13,14 +12,16 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Index,
+    LargeBinary,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
-from database.base import Base
+from database.base import Base, uuid7
 
 
 class AuthProvider(str, Enum):
@@ -36,7 +37,7 @@ class User(Base):
     """User model for authentication."""
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String(255), unique=True, nullable=False, index=True)
     name = Column(String(255), nullable=True)
     picture = Column(Text, nullable=True)
@@ -67,21 +68,39 @@ class User(Base):
     )
     
     # Relationships
+    # Collections never lazy-load: callers must opt in with selectinload(),
+    # so accidental N+1 access raises instead of issuing a query per row.
+    # Deletes rely on the ON DELETE CASCADE foreign keys (passive_deletes).
     sessions = relationship(
         "Session",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     templates = relationship(
         "Template",
         back_populates="user",
         cascade="all, delete-orphan",
-        foreign_keys="Template.user_id"
+        foreign_keys="Template.user_id",
+        lazy="raise_on_sql",
+        passive_deletes=True,
     )
     reservoir_documents = relationship(
         "ReservoirDocument",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
+        passive_deletes=True,
+    )
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint(
+            "auth_provider",
+            "provider_user_id",
+            name="uq_users_auth_provider_provider_user_id",
+        ),
     )
 
     def __repr__(self) -> str:
@@ -108,13 +127,14 @@ class Session(Base):
     """Session model for tracking user sessions."""
     __tablename__ = "sessions"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False
     )
-    token = Column(String(64), unique=True, nullable=False, index=True)
+    # SHA-256 digest of the session token; the raw token only lives in the cookie
+    token = Column(LargeBinary(32), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     user_agent = Column(Text, nullable=True)
     ip_address = Column(String(45), nullable=True)  # IPv6 max length
@@ -133,8 +153,16 @@ class Session(Base):
 
     # Indexes
     __table_args__ = (
+        # Token lookups also read user_id and expires_at, so carry them in
+        # the unique index and let Postgres answer with an index-only scan
+        Index(
+            "ix_sessions_token",
+            "token",
+            unique=True,
+            postgresql_include=["user_id", "expires_at"],
+        ),
+        # Postgres does not index foreign keys; used by revoke_all_sessions
         Index("ix_sessions_user_id", "user_id"),
-        Index("ix_sessions_expires_at", "expires_at"),
     )
 
     def __repr__(self) -> str:
@@ -145,7 +173,7 @@ class Session(Base):
         return {
             "id": str(self.id),
             "user_id": str(self.user_id),
-            "token": self.token,
+            "token": self.token.hex() if self.token else None,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
             "user_agent": self.user_agent,
             "ip_address": self.ip_address,
@@ -160,12 +188,11 @@ class ReservoirDocument(Base):
     """
     __tablename__ = "reservoir_documents"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True
     )
     
     # Document metadata
@@ -178,6 +205,7 @@ class ReservoirDocument(Base):
     # Storage
     s3_key = Column(String(512), nullable=True)  # S3 storage key if uploaded to cloud
     content_hash = Column(String(64), nullable=True)  # SHA-256 hash for deduplication
+    quick_hash = Column(String(64), nullable=True)  # SHA-256 of size + first 64 KB, probed before content_hash
     
     # Extracted content
     extracted_text = Column(Text, nullable=True)  # Full extracted text content
@@ -200,9 +228,20 @@ class ReservoirDocument(Base):
 
     # Indexes
     __table_args__ = (
-        Index("ix_reservoir_documents_user_id", "user_id"),
-        Index("ix_reservoir_documents_content_hash", "content_hash"),
-        Index("ix_reservoir_documents_created_at", "created_at"),
+        # Every query is scoped to one user, so user_id leads each index
+        # (and serves the foreign key on its own)
+        Index(
+            "ix_reservoir_documents_user_id_content_hash",
+            "user_id",
+            "content_hash",
+            unique=True,
+        ),
+        Index("ix_reservoir_documents_user_id_quick_hash", "user_id", "quick_hash"),
+        Index(
+            "ix_reservoir_documents_user_id_created_at",
+            "user_id",
+            created_at.desc(),
+        ),
     )
 
     def __repr__(self) -> str:
@@ -230,7 +269,7 @@ class Template(Base):
     """Template model for analysis templates."""
     __tablename__ = "templates"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String(255), nullable=False)
     subtitle = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
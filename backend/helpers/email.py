@@ -1,6 +1,8 @@
 """
 Email sending utilities using Resend.
 """
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -11,16 +13,27 @@ from core.logfire_config import log_error, log_info, log_warning
 
 # Initialize Resend with API key from settings
 _resend_key = settings.api_keys.resend_api_key
-resend.api_key = _resend_key.get_secret_value() if _resend_key else None
+RESEND_API_KEY = _resend_key.get_secret_value() if _resend_key else None
+resend.api_key = RESEND_API_KEY
 
 CLIENT_DOMAIN = settings.client_domain
 FROM_EMAIL = settings.email.from_email
 FROM_NAME = settings.email.from_name
+_DEFAULT_FROM = f"{FROM_NAME} <{FROM_EMAIL}>"
 
+# Caps concurrent Resend calls from background tasks sharing the threadpool
+_SEND_SLOTS = threading.BoundedSemaphore(20)
 
+
+# Bundled templates live next to this module
+_TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+@lru_cache(maxsize=32)
 def load_email_template(template_name: str) -> str:
     """
     Load HTML email template from templates directory.
+    Templates are immutable, so each file is read once per process.
     
     Args:
         template_name: Name of the template file
@@ -28,19 +41,30 @@ def load_email_template(template_name: str) -> str:
     Returns:
         str: The template content
     """
-    # Get the directory of the current file
-    current_dir = Path(__file__).parent
-    template_path = current_dir / "templates" / template_name
+    template_path = _TEMPLATES_DIR / template_name
 
     try:
-        with open(template_path, "r", encoding="utf-8") as file:
-            return file.read()
+        return template_path.read_text(encoding="utf-8")
     except FileNotFoundError:
         raise FileNotFoundError(
             f"Template {template_name} not found at {template_path}"
         )
 
 
+def render_email_template(template_name: str, **context: str) -> str:
+    """
+    Render an email template, filling its {placeholder} fields.
+    
+    Args:
+        template_name: Name of the template file
+        **context: Values for the template placeholders
+        
+    Returns:
+        str: The rendered template
+    """
+    return load_email_template(template_name).format_map(context)
+
+
 def send_email(
     to_email: str,
     subject: str,
@@ -70,7 +94,11 @@ def send_email(
 
     try:
         payload: resend.Emails.SendParams = {
-            "from": f"{from_name} <{from_address}>",
+            "from": (
+                _DEFAULT_FROM
+                if from_name == FROM_NAME and from_address == FROM_EMAIL
+                else f"{from_name} <{from_address}>"
+            ),
             "to": to_email,
             "subject": subject,
             "html": html_content,
@@ -80,7 +108,8 @@ def send_email(
         if text_content:
             payload["text"] = text_content
 
-        result = resend.Emails.send(payload)
+        with _SEND_SLOTS:
+            result = resend.Emails.send(payload)
         log_info("Email sent successfully", to=to_email, email_id=result.get('id', 'unknown'))
         return True
 
@@ -104,31 +133,12 @@ def send_welcome_email(email: str, name: Optional[str] = None) -> bool:
         formatted_name = f", {name}" if name else ""
         subject = "Welcome to 2.0Labs!"
         
-        html_content = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                <div style="text-align: center; margin-bottom: 30px;">
-                    <h1 style="color: #10b981; margin-bottom: 10px;">2.0Labs</h1>
-                    <h2 style="color: #666; font-weight: normal;">Welcome{formatted_name}!</h2>
-                </div>
-                
-                <div style="background-color: #f8f9fa; border-radius: 8px; padding: 30px; text-align: center; margin-bottom: 30px;">
-                    <p style="font-size: 16px; color: #333; margin-bottom: 20px;">
-                        Thank you for joining 2.0Labs. We're excited to have you on board!
-                    </p>
-                    <a href="{CLIENT_DOMAIN}" style="display: inline-block; background-color: #10b981; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold;">
-                        Get Started
-                    </a>
-                </div>
-                
-                <div style="text-align: center; color: #666; font-size: 14px;">
-                    <p>If you have any questions, feel free to reach out to us.</p>
-                </div>
-            </body>
-        </html>
-        """
-        
-        text_content = f"Welcome{formatted_name}! Thank you for joining 2.0Labs. Visit {CLIENT_DOMAIN} to get started."
+        html_content = render_email_template(
+            "welcome.html", name=formatted_name, client_domain=CLIENT_DOMAIN
+        )
+        text_content = render_email_template(
+            "welcome.txt", name=formatted_name, client_domain=CLIENT_DOMAIN
+        )
         
         return send_email(
             to_email=email,
@@ -0,0 +1,197 @@
+"""
+PDF text extraction with PyMuPDF, or pypdfium2 when PDF_BACKEND=pypdfium2.
+All parsing, including counting pages, runs in a process pool, so it doesn't
+compete with request handling for the server's GIL. Large PDFs are split
+into page ranges that are extracted in parallel. extract_pdf_text blocks
+its calling thread until the pool is done, so call it via asyncio.to_thread.
+"""
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional backend
+    pdfium = None
+
+from core.config import settings
+
+# Below this many pages, one worker extracts the whole file; splitting it
+# would cost more in pickling the file than it saves
+PARALLEL_MIN_PAGES = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Extracted text of recently parsed PDFs, keyed by SHA-256 of the file, so
+# the same file uploaded again in this process isn't parsed twice. Bounded by
+# total characters; texts too large to be worth keeping aren't cached.
+TEXT_CACHE_MAX_CHARS = 16 * 1024 * 1024
+TEXT_CACHE_MAX_ENTRY_CHARS = 2 * 1024 * 1024
+_text_cache: Dict[str, str] = {}
+_text_cache_chars = 0
+_text_cache_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the extraction process pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=max(settings.pdf.workers, 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the extraction worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _get_backend() -> str:
+    """Return the configured extraction backend, if it's installed."""
+    if settings.pdf.backend.lower() == "pypdfium2" and pdfium is not None:
+        return "pypdfium2"
+    return "pymupdf"
+
+
+def _page_count(file_bytes: bytes, backend: str) -> int:
+    """Count the pages of a PDF."""
+    if backend == "pypdfium2":
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _page_texts(file_bytes: bytes, start: int, end: int, backend: str) -> List[str]:
+    """Extract the raw text of each page in [start, end)."""
+    if backend == "pypdfium2":
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            texts = []
+            for page_num in range(start, end):
+                page = pdf[page_num]
+                textpage = page.get_textpage()
+                # PDFium ends lines with \r\n; match PyMuPDF's \n
+                texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    try:
+        return [doc[page_num].get_text() for page_num in range(start, end)]
+    finally:
+        doc.close()
+
+
+def _extract_page_range(
+    file_bytes: bytes, start: int, end: int, backend: str = "pymupdf"
+) -> List[str]:
+    """Extract the non-empty pages in [start, end) as labelled text blocks."""
+    texts = _page_texts(file_bytes, start, end, backend)
+    return [
+        f"--- Page {page_num} ---\n{text}"
+        for page_num, text in enumerate(texts, start + 1)
+        if text.strip()
+    ]
+
+
+def _extract_short_pdf(file_bytes: bytes, backend: str) -> Tuple[int, Optional[List[str]]]:
+    """
+    Pool task: count the pages, and extract them all if the PDF is too
+    short to be worth splitting.
+
+    Returns:
+        The page count, and the labelled page texts (None for a long PDF)
+    """
+    page_count = _page_count(file_bytes, backend)
+    if page_count >= PARALLEL_MIN_PAGES:
+        return page_count, None
+    return page_count, _extract_page_range(file_bytes, 0, page_count, backend)
+
+
+def extract_pdf_text(file_bytes: bytes, content_hash: Optional[str] = None) -> str:
+    """
+    Extract text from every page of a PDF, reusing the result for a file
+    that was recently extracted.
+
+    Args:
+        file_bytes: The PDF file content
+        content_hash: SHA-256 hex digest of file_bytes, if already known
+
+    Returns:
+        str: Page texts, each prefixed with a "--- Page N ---" header
+    """
+    if content_hash is None:
+        content_hash = hashlib.sha256(file_bytes).hexdigest()
+
+    with _text_cache_lock:
+        text = _text_cache.get(content_hash)
+    if text is not None:
+        return text
+
+    text = _extract_pdf_text(file_bytes)
+    if len(text) <= TEXT_CACHE_MAX_ENTRY_CHARS:
+        _cache_text(content_hash, text)
+    return text
+
+
+def _cache_text(content_hash: str, text: str) -> None:
+    """Cache an extracted text, evicting the oldest until under budget."""
+    global _text_cache_chars
+    with _text_cache_lock:
+        if content_hash in _text_cache:
+            return
+        while _text_cache and _text_cache_chars + len(text) > TEXT_CACHE_MAX_CHARS:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _text_cache_chars -= len(_text_cache.pop(next(iter(_text_cache))))
+        _text_cache[content_hash] = text
+        _text_cache_chars += len(text)
+
+
+def _extract_pdf_text(file_bytes: bytes) -> str:
+    """Extract text from every page in worker processes."""
+    backend = _get_backend()
+    page_count, parts = _get_pool().submit(
+        _extract_short_pdf, file_bytes, backend
+    ).result()
+    if parts is not None:
+        return "\n\n".join(parts)
+
+    # One contiguous page range per pool process, in page order, so each
+    # process receives one copy of the file
+    workers = min(max(settings.pdf.workers, 1), page_count)
+    step = -(-page_count // workers)  # ceil division
+    starts = range(0, page_count, step)
+    ends = [min(start + step, page_count) for start in starts]
+
+    results = _get_pool().map(
+        _extract_page_range,
+        [file_bytes] * len(starts),
+        starts,
+        ends,
+        [backend] * len(starts),
+    )
+    return "\n\n".join(part for parts in results for part in parts)
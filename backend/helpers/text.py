@@ -0,0 +1,46 @@
+"""
+Text decoding for uploaded files.
+"""
+import codecs
+from typing import Optional
+
+# Byte order marks and the codecs that strip them. UTF-32 LE is checked
+# before UTF-16 LE because its BOM starts with the UTF-16 LE one.
+_BOM_CODECS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def decode_text(data: bytes, fallback: Optional[str] = None) -> str:
+    """
+    Decode uploaded file content as text.
+
+    A byte order mark selects its codec directly; otherwise UTF-8 is tried,
+    then the fallback codec.
+
+    Args:
+        data: The raw file content
+        fallback: Codec to use when the content isn't valid UTF-8
+
+    Returns:
+        str: The decoded text, without any byte order mark
+
+    Raises:
+        UnicodeDecodeError: If the content isn't UTF-8 and there's no fallback
+    """
+    for bom, encoding in _BOM_CODECS:
+        if data.startswith(bom):
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                break  # Not really a BOM; decode as if there were none
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        if fallback is None:
+            raise
+        return data.decode(fallback)
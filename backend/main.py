@@ -9,8 +9,11 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from auth.google import google_auth_client
 from core.config import settings
-from core.logfire_config import log_info, log_error, instrument_fastapi
+from core.logfire_config import log_info, log_error, log_warning, instrument_fastapi
+from database.base import DBSessionMiddleware, async_engine, engine, warm_up_pools
+from helpers.pdf import shutdown_pdf_pool
 from routers import auth_router, chat_router, extract_router, graph_router, infer_router, reservoir_router, template_router, upload_router, visualization_router
 from services.llm_service import llm_service
 
@@ -21,6 +24,11 @@ async def lifespan(app: FastAPI):
     # Startup
     try:
         log_info("2.0Labs Backend starting up...")
+        try:
+            await warm_up_pools()
+        except Exception as e:
+            # Not fatal: connections will be opened on demand instead
+            log_warning("Database pool warm-up failed", error=str(e))
         log_info("Application ready", provider=llm_service.provider)
     except Exception as e:
         log_error("Failed during startup", error=e)
@@ -30,6 +38,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     log_info("2.0Labs Backend shutting down")
+    await google_auth_client.aclose()
+    await async_engine.dispose()
+    engine.dispose()
+    shutdown_pdf_pool()
 
 
 app = FastAPI(
@@ -53,6 +65,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One database session per request, shared by every Depends(get_async_db)
+app.add_middleware(DBSessionMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(chat_router)
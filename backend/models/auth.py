@@ -1,18 +1,29 @@
 """
 Pydantic schemas for authentication.
 """
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass
+from typing import Annotated, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    EmailStr,
+    StringConstraints,
+)
 
 
 # ============= User Schemas =============
 
 class UserBase(BaseModel):
-    """Base user schema."""
-    email: EmailStr
+    """
+    Base user schema.
+    Emails are plain str on internal and response schemas: they were
+    validated on the way in (request bodies or the OAuth provider).
+    """
+    email: str
     name: Optional[str] = None
     picture: Optional[str] = None
     is_active: bool = True
@@ -21,11 +32,6 @@ class UserBase(BaseModel):
     locale: Optional[str] = None
 
 
-class UserCreate(UserBase):
-    """Schema for creating a new user with password."""
-    password: str
-
-
 class UserCreateWithProvider(UserBase):
     """Schema for creating a user from OAuth provider."""
     auth_provider: str
@@ -34,7 +40,7 @@ class UserCreateWithProvider(UserBase):
 
 class UserUpdate(BaseModel):
     """Schema for updating a user."""
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None
     name: Optional[str] = None
     picture: Optional[str] = None
     is_active: Optional[bool] = None
@@ -42,63 +48,12 @@ class UserUpdate(BaseModel):
     locale: Optional[str] = None
 
 
-class User(UserBase):
-    """Schema for returning a user."""
-    id: UUID
-    auth_provider: str
-    is_email_verified: bool = False
-    created_at: datetime
-    updated_at: datetime
-
-    class Config:
-        from_attributes = True
-
-
-# ============= Session Schemas =============
-
-class SessionBase(BaseModel):
-    """Base session schema."""
-    user_id: UUID
-    expires_at: datetime
-    user_agent: Optional[str] = None
-    ip_address: Optional[str] = None
-
-
-class SessionCreate(SessionBase):
-    """Schema for creating a session."""
-    token: str
-
-
-class Session(SessionBase):
-    """Schema for returning a session."""
-    id: UUID
-    token: str
-    created_at: datetime
-
-    class Config:
-        from_attributes = True
-
-
-# ============= Token Schemas =============
-
-class Token(BaseModel):
-    """Token schema for JWT."""
-    access_token: str
-    token_type: str = "bearer"
-
-
-class TokenPayload(BaseModel):
-    """Schema to encode in JWT."""
-    sub: str  # user_id
-    exp: int  # expiration time
-
-
 # ============= OAuth Schemas =============
 
 class OAuthUserInfo(BaseModel):
     """OAuth response user info."""
     id: str
-    email: EmailStr
+    email: str
     name: Optional[str] = None
     picture: Optional[str] = None
     locale: Optional[str] = None
@@ -106,18 +61,35 @@ class OAuthUserInfo(BaseModel):
 
 # ============= Current User Schema =============
 
-class CurrentUser(BaseModel):
-    """Current authenticated user with permissions."""
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """
+    Current authenticated user with permissions.
+
+    A frozen slotted dataclass rather than a Pydantic model: it's built on
+    every authenticated request from trusted database values and shared
+    read-only across dependencies. Use CurrentUserOut to serialize it.
+    """
     id: UUID
-    email: EmailStr
+    email: str
     name: Optional[str] = None
     is_admin: bool = False
     picture: Optional[str] = None
     is_email_verified: bool = False
     is_active: bool = True
 
-    class Config:
-        from_attributes = True
+
+class CurrentUserOut(BaseModel):
+    """Response schema for the current user."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    email: str
+    name: Optional[str] = None
+    is_admin: bool = False
+    picture: Optional[str] = None
+    is_email_verified: bool = False
+    is_active: bool = True
 
 
 # ============= Auth Response Schemas =============
@@ -126,25 +98,36 @@ class AuthResponse(BaseModel):
     """Response model for auth routes."""
     success: bool
     message: str
-    user: Optional[CurrentUser] = None
+    user: Optional[CurrentUserOut] = None
     newly_created: bool = False
 
 
 # ============= Email Auth Request Schemas =============
 
+# Emails from request bodies are trimmed and lower-cased during validation,
+# so handlers can use them directly for lookups
+NormalizedEmail = Annotated[
+    EmailStr,
+    BeforeValidator(lambda v: v.strip() if isinstance(v, str) else v),
+    AfterValidator(str.lower),
+]
+
+
 class EmailSignInRequest(BaseModel):
     """Request model for email sign-in."""
-    email: EmailStr
+    email: NormalizedEmail
 
 
 class EmailSetNameRequest(BaseModel):
     """Request model for setting name."""
-    email: EmailStr
+    email: NormalizedEmail
     name: str
 
 
 class EmailVerifyRequest(BaseModel):
     """Request model for email verification."""
-    email: EmailStr
-    code: str = Field(..., min_length=6, max_length=6)
+    email: NormalizedEmail
+    code: Annotated[
+        str, StringConstraints(strip_whitespace=True, min_length=6, max_length=6)
+    ]
 
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional, List, Literal, Union
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Annotated, Optional, List, Literal, Union
 from datetime import datetime
 
+from .matrix import MatrixContext
+
 
 class CellCitation(BaseModel):
     type: Literal["cell"] = "cell"
@@ -23,7 +25,16 @@ class DocumentCitation(BaseModel):
     excerpt: str
 
 
-Citation = Union[CellCitation, DocumentCitation]
+# Tagged on "type" so validation dispatches straight to the matching model
+Citation = Annotated[Union[CellCitation, DocumentCitation], Field(discriminator="type")]
+
+# Built once; serializes a whole citation list in a single call
+CITATION_LIST_ADAPTER = TypeAdapter(List[Citation])
+
+
+def dump_citations(citations: List[Citation]) -> List[dict]:
+    """Serialize citations to JSON-compatible dicts."""
+    return CITATION_LIST_ADAPTER.dump_python(citations, mode="json")
 
 
 class ChatMessage(BaseModel):
@@ -37,7 +48,7 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     query: str
     session_id: str
-    matrix_context: dict  # Full matrix state from frontend
+    matrix_context: MatrixContext  # Full matrix state from frontend
 
 
 class ChatResponse(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal, Dict, List
 
 
@@ -10,8 +10,11 @@ class Metric(BaseModel):
 
 
 class CellData(BaseModel):
+    # Accepts the frontend's camelCase isLoading as well as is_loading
+    model_config = ConfigDict(populate_by_name=True)
+
     value: Optional[str] = None
-    is_loading: bool = False
+    is_loading: bool = Field(False, alias="isLoading")
     confidence: Optional[Literal['High', 'Medium', 'Exploratory']] = None
     reasoning: Optional[str] = None
     sources: Optional[List[str]] = None
@@ -5,11 +5,11 @@ These models validate the structured JSON response from the LLM chart orchestrat
 and provide type safety for the visualization pipeline.
 """
 from typing import Optional, List, Literal
-from pydantic import BaseModel, Field, model_validator
+from pydantic import AliasPath, BaseModel, ConfigDict, Field, model_validator
 
 
 class AxisSpec(BaseModel):
-    """Axis specification with semantic metadata."""
+    """Axis specification with semantic metadata (view over LLMChartSpec fields)."""
     label: str = Field(..., description="Human-readable axis label")
     semantic: Optional[str] = Field(None, description="Semantic meaning (e.g., Year, Time, Entity)")
     unit: Optional[str] = Field(None, description="Unit of measurement (EUR, %, ratio)")
@@ -37,13 +37,24 @@ class LLMChartSpec(BaseModel):
     
     When should_render is False, all other fields should be None/empty.
     When should_render is True, intent and chart_type are required.
+
+    The LLM returns axes as nested {"axes": {"x": {...}, "y": {...}}}. They
+    are read straight into flat x_*/y_* fields through alias paths, so
+    validation stays a single model; use .axes for the nested view.
     """
+    model_config = ConfigDict(populate_by_name=True)
+
     should_render: bool = Field(..., description="Whether a chart should be rendered")
     reason: Optional[str] = Field(None, description="Reason when should_render is False")
     primary_question: Optional[str] = Field(None, description="The analytical question the chart answers")
     intent: Optional[LLMIntentType] = Field(None, description="Analytical intent category")
     chart_type: Optional[LLMChartType] = Field(None, description="Chart type to render")
-    axes: Optional[ChartAxes] = Field(None, description="Axis specifications")
+    x_label: Optional[str] = Field(None, validation_alias=AliasPath("axes", "x", "label"), description="X axis label")
+    x_semantic: Optional[str] = Field(None, validation_alias=AliasPath("axes", "x", "semantic"), description="X axis semantic meaning")
+    x_unit: Optional[str] = Field(None, validation_alias=AliasPath("axes", "x", "unit"), description="X axis unit")
+    y_label: Optional[str] = Field(None, validation_alias=AliasPath("axes", "y", "label"), description="Y axis label")
+    y_semantic: Optional[str] = Field(None, validation_alias=AliasPath("axes", "y", "semantic"), description="Y axis semantic meaning")
+    y_unit: Optional[str] = Field(None, validation_alias=AliasPath("axes", "y", "unit"), description="Y axis unit")
     emphasis: Optional[List[str]] = Field(None, description="What the visualization should emphasize")
     insight: Optional[str] = Field(None, description="Single insight annotation")
     placement: Optional[Literal["SIDE_RAIL"]] = Field("SIDE_RAIL", description="Where to render the chart")
@@ -58,6 +69,16 @@ class LLMChartSpec(BaseModel):
                 raise ValueError("chart_type is required when should_render is True")
         return self
 
+    @property
+    def axes(self) -> Optional[ChartAxes]:
+        """Nested axis view, built on demand. None unless both axes have labels."""
+        if self.x_label is None or self.y_label is None:
+            return None
+        return ChartAxes(
+            x=AxisSpec(label=self.x_label, semantic=self.x_semantic, unit=self.x_unit),
+            y=AxisSpec(label=self.y_label, semantic=self.y_semantic, unit=self.y_unit),
+        )
+
 
 # Mapping from LLM chart types to frontend chart types
 LLM_TO_FRONTEND_CHART_TYPE = {
@@ -3,16 +3,20 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, AsyncGenerator
 from datetime import datetime
+import asyncio
 import uuid
 import re
-import json
 
-import sys
-sys.path.append("..")
+import orjson
+
+try:
+    from fastapi.sse import EventSourceResponse, ServerSentEvent
+except ImportError:  # FastAPI without native SSE support
+    EventSourceResponse = None
 
 from models.chat import (
     ChatRequest, ChatResponse, ChatMessage, 
-    Citation, CellCitation, DocumentCitation
+    Citation, CellCitation, DocumentCitation, dump_citations
 )
 from models.matrix import Metric
 from models.document import Document
@@ -20,6 +24,7 @@ from services.llm_service import llm_service
 from services.matrix_retriever import MatrixRetriever
 from services.document_retriever import DocumentRetriever
 from services.citation import CitationGenerator
+from services.chat_cache import chat_response_cache
 from state.store import store
 
 router = APIRouter(prefix="/api", tags=["chat"])
@@ -29,6 +34,19 @@ matrix_retriever = MatrixRetriever()
 document_retriever = DocumentRetriever()
 citation_generator = CitationGenerator()
 
+# Citation post-processing patterns, compiled once
+_CITATION_LEAKAGE_PATTERN = re.compile(
+    r'\[(Doc|Cell)\s*(\d+)\](?:\s*\([^)]*\))?'  # [Doc N] / [Cell N], optional (metadata)
+    r'|\s*\(doc_id=[^)]*\)'  # stray (doc_id=...) on its own
+)
+_CITATION_REF_PATTERN = re.compile(r'\[(\d+)\]')
+
+# Longest chunk excerpt copied into a repaired document citation
+_MAX_EXCERPT = 500
+
+# Speaker labels for the chat history sent to the LLM; any other role is the assistant
+_ROLE_LABELS = {"user": "User"}
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -67,7 +85,9 @@ async def chat(request: ChatRequest):
         # Step 2: Document fallback if needed
         doc_chunks = []
         if not matrix_sufficient:
-            doc_chunks = document_retriever.retrieve(
+            # Chunking and scoring full documents is CPU-bound; keep it off the event loop
+            doc_chunks = await asyncio.to_thread(
+                document_retriever.retrieve,
                 query=request.query,
                 documents=documents,
                 max_chunks=5
@@ -76,20 +96,19 @@ async def chat(request: ChatRequest):
         document_context = document_retriever.format_for_context(doc_chunks)
         
         # Step 3: Get chat history
-        chat_history = store.get_chat_history(request.session_id, limit=10)
-        history_text = "\n".join([
-            f"{'User' if m.role == 'user' else 'Assistant'}: {m.content}"
-            for m in chat_history[-6:]  # Last 6 messages for context
-        ])
+        chat_history = store.get_chat_history(request.session_id, limit=6)  # Last 6 messages for context
+        history_text = "\n".join(
+            f"{_ROLE_LABELS.get(m.role, 'Assistant')}: {m.content}"
+            for m in chat_history
+        )
         
-        # Step 4: Store user message
+        # Step 4: Create user message (stored together with the reply)
         user_message = ChatMessage(
             id=str(uuid.uuid4()),
             role="user",
             content=request.query,
             timestamp=datetime.now()
         )
-        store.add_chat_message(request.session_id, user_message)
         
         # Build citation index map from context
         # cell_matches indices correspond to [Cell 1], [Cell 2], etc.
@@ -98,13 +117,20 @@ async def chat(request: ChatRequest):
         cell_map = {i: match for i, match in enumerate(cell_matches, 1)}
         doc_map = {i: chunk for i, chunk in enumerate(doc_chunks, 1)}
         
-        # Step 5: Generate response with LLM (OpenAI by default, Gemini as fallback)
-        llm_response = await llm_service.chat_with_context(
-            query=request.query,
-            matrix_context=matrix_context,
-            document_context=document_context,
-            chat_history=history_text
+        # Step 5: Generate response with LLM (OpenAI by default, Gemini as fallback),
+        # reusing a cached answer for the same question and context
+        cache_key = chat_response_cache.make_key(
+            request.query, matrix_context, document_context, history_text
         )
+        llm_response = chat_response_cache.get(cache_key)
+        if llm_response is None:
+            llm_response = await llm_service.chat_with_context(
+                query=request.query,
+                matrix_context=matrix_context,
+                document_context=document_context,
+                chat_history=history_text
+            )
+            chat_response_cache.set(cache_key, llm_response)
         
         # Step 6: Parse and structure response
         raw_content = llm_response.get("response", "I was unable to generate a response.")
@@ -124,8 +150,8 @@ async def chat(request: ChatRequest):
             citations=citations
         )
         
-        # Store assistant message
-        store.add_chat_message(request.session_id, assistant_message)
+        # Store the user message and reply in one write
+        store.add_chat_messages(request.session_id, [user_message, assistant_message])
         
         return ChatResponse(
             message=assistant_message,
@@ -140,64 +166,73 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
 
-@router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def _chat_stream_events(request: ChatRequest) -> AsyncGenerator[dict, None]:
     """
-    Streaming version of chat endpoint using Server-Sent Events.
-    Streams text tokens, then sends citations at the end.
+    Produce the chat stream as event payloads: text tokens, then citations,
+    then a done (or error) event.
     """
-    async def generate() -> AsyncGenerator[str, None]:
-        try:
-            # Sync context from frontend
-            store.sync_context(request.matrix_context)
-            
-            # Get current state
-            documents = store.get_all_documents()
-            metrics = store.get_all_metrics()
-            cells = store.get_all_cells()
-            cells_dict = {k: v for k, v in cells.items()}
-            
-            # Matrix-first retrieval
-            cell_matches = matrix_retriever.retrieve(
+    try:
+        # Sync context from frontend
+        store.sync_context(request.matrix_context)
+        
+        # Get current state
+        documents = store.get_all_documents()
+        metrics = store.get_all_metrics()
+        cells = store.get_all_cells()
+        cells_dict = {k: v for k, v in cells.items()}
+        
+        # Matrix-first retrieval
+        cell_matches = matrix_retriever.retrieve(
+            query=request.query,
+            cells=cells_dict,
+            metrics=metrics,
+            documents=documents
+        )
+        matrix_context = matrix_retriever.format_for_context(cell_matches)
+        matrix_sufficient = matrix_retriever.has_sufficient_data(cell_matches)
+        
+        # Document fallback if needed
+        doc_chunks = []
+        if not matrix_sufficient:
+            # Chunking and scoring full documents is CPU-bound; keep it off the event loop
+            doc_chunks = await asyncio.to_thread(
+                document_retriever.retrieve,
                 query=request.query,
-                cells=cells_dict,
-                metrics=metrics,
-                documents=documents
-            )
-            matrix_context = matrix_retriever.format_for_context(cell_matches)
-            matrix_sufficient = matrix_retriever.has_sufficient_data(cell_matches)
-            
-            # Document fallback if needed
-            doc_chunks = []
-            if not matrix_sufficient:
-                doc_chunks = document_retriever.retrieve(
-                    query=request.query,
-                    documents=documents,
-                    max_chunks=5
-                )
-            document_context = document_retriever.format_for_context(doc_chunks)
-            
-            # Get chat history
-            chat_history = store.get_chat_history(request.session_id, limit=10)
-            history_text = "\n".join([
-                f"{'User' if m.role == 'user' else 'Assistant'}: {m.content}"
-                for m in chat_history[-6:]
-            ])
-            
-            # Store user message
-            user_message = ChatMessage(
-                id=str(uuid.uuid4()),
-                role="user",
-                content=request.query,
-                timestamp=datetime.now()
+                documents=documents,
+                max_chunks=5
             )
-            store.add_chat_message(request.session_id, user_message)
-            
-            # Build citation maps
-            cell_map = {i: match for i, match in enumerate(cell_matches, 1)}
-            doc_map = {i: chunk for i, chunk in enumerate(doc_chunks, 1)}
-            
-            # Stream from LLM
+        document_context = document_retriever.format_for_context(doc_chunks)
+        
+        # Get chat history
+        chat_history = store.get_chat_history(request.session_id, limit=6)  # Last 6 messages for context
+        history_text = "\n".join(
+            f"{_ROLE_LABELS.get(m.role, 'Assistant')}: {m.content}"
+            for m in chat_history
+        )
+        
+        # Create user message (stored together with the reply)
+        user_message = ChatMessage(
+            id=str(uuid.uuid4()),
+            role="user",
+            content=request.query,
+            timestamp=datetime.now()
+        )
+        
+        # Build citation maps
+        cell_map = {i: match for i, match in enumerate(cell_matches, 1)}
+        doc_map = {i: chunk for i, chunk in enumerate(doc_chunks, 1)}
+        
+        # Stream from LLM, or replay a cached answer in one text event
+        cache_key = chat_response_cache.make_key(
+            request.query, matrix_context, document_context, history_text
+        )
+        cached = chat_response_cache.get(cache_key)
+        
+        if cached is not None:
+            full_content = cached.get("response", "")
+            raw_citations = cached.get("citations", [])
+            yield {"type": "text", "content": full_content}
+        else:
             full_content = ""
             raw_citations = []
             
@@ -210,43 +245,77 @@ async def chat_stream(request: ChatRequest):
                 if chunk.get("type") == "text":
                     text = chunk.get("content", "")
                     full_content += text
-                    yield f"data: {json.dumps({'type': 'text', 'content': text})}\n\n"
+                    yield {"type": "text", "content": text}
+                    # Tokens already buffered by the LLM client arrive without
+                    # awaiting; yield to the loop so each one is flushed as sent
+                    await asyncio.sleep(0)
                 elif chunk.get("type") == "citations":
                     raw_citations = chunk.get("citations", [])
             
-            # Process citations
-            enriched_citations = _enrich_citations(raw_citations, cell_map, doc_map)
-            content, citations = _normalize_citations(full_content, enriched_citations)
-            
-            # Send final message with citations
-            message_id = str(uuid.uuid4())
-            assistant_message = ChatMessage(
-                id=message_id,
-                role="assistant",
-                content=content,
-                timestamp=datetime.now(),
-                citations=citations
+            chat_response_cache.set(
+                cache_key, {"response": full_content, "citations": raw_citations}
             )
-            store.add_chat_message(request.session_id, assistant_message)
-            
-            # Send citations and done signal
-            citations_data = [c.model_dump() if hasattr(c, 'model_dump') else dict(c) for c in citations]
-            yield f"data: {json.dumps({'type': 'citations', 'citations': citations_data})}\n\n"
-            yield f"data: {json.dumps({'type': 'done', 'message_id': message_id})}\n\n"
-            
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
-    
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+        
+        # Process citations
+        enriched_citations = _enrich_citations(raw_citations, cell_map, doc_map)
+        content, citations = _normalize_citations(full_content, enriched_citations)
+        
+        # Send final message with citations
+        message_id = str(uuid.uuid4())
+        assistant_message = ChatMessage(
+            id=message_id,
+            role="assistant",
+            content=content,
+            timestamp=datetime.now(),
+            citations=citations
+        )
+        store.add_chat_messages(request.session_id, [user_message, assistant_message])
+        
+        # Send citations and done signal
+        citations_data = dump_citations(citations)
+        yield {"type": "citations", "citations": citations_data}
+        yield {"type": "done", "message_id": message_id}
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield {"type": "error", "error": str(e)}
+
+
+if EventSourceResponse is not None:
+    @router.post("/chat/stream", response_class=EventSourceResponse)
+    async def chat_stream(request: ChatRequest):
+        """
+        Streaming version of chat endpoint using Server-Sent Events.
+        Streams text tokens, then sends citations at the end.
+        FastAPI frames each event and sends keep-alive pings while the LLM is idle.
+        """
+        async for event in _chat_stream_events(request):
+            yield ServerSentEvent(raw_data=_sse_data(event))
+else:
+    @router.post("/chat/stream")
+    async def chat_stream(request: ChatRequest):
+        """
+        Streaming version of chat endpoint using Server-Sent Events.
+        Streams text tokens, then sends citations at the end.
+        """
+        async def generate() -> AsyncGenerator[str, None]:
+            async for event in _chat_stream_events(request):
+                yield f"data: {_sse_data(event)}\n\n"
+
+        return StreamingResponse(
+            generate(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            }
+        )
+
+
+def _sse_data(event: dict) -> str:
+    """Serialize a stream event payload for an SSE data field."""
+    return orjson.dumps(event).decode()
 
 
 def _enrich_citations(raw_citations: List[dict], cell_map: dict, doc_map: dict) -> List[dict]:
@@ -260,56 +329,43 @@ def _enrich_citations(raw_citations: List[dict], cell_map: dict, doc_map: dict)
     
     This function maps them back to actual IDs.
     """
-    enriched = []
+    enriched: List[dict] = [None] * len(raw_citations)
     
-    for c in raw_citations:
-        citation = dict(c)  # Copy to avoid mutation
+    for i, c in enumerate(raw_citations):
+        # Citations with valid IDs pass through uncopied; only repairs copy
+        citation = c
         
-        if citation.get("type") == "cell":
+        if c.get("type") == "cell":
             # Try to find the cell by index or by matching doc_id/metric_id
-            idx = citation.get("index", 0)
-            doc_id = citation.get("doc_id", "")
-            metric_id = citation.get("metric_id", "")
+            idx = c.get("index", 0)
+            doc_id = c.get("doc_id", "")
             
             # If IDs look like placeholders, try to get from cell_map
-            if not doc_id or doc_id == "..." or len(doc_id) < 5:
-                if idx in cell_map:
-                    match = cell_map[idx]
-                    citation["doc_id"] = match.doc_id
-                    citation["doc_name"] = match.doc_name
-                    citation["metric_id"] = match.metric_id
-                    citation["metric_label"] = match.metric_label
-                    citation["value"] = match.cell.value if match.cell else ""
-                elif len(cell_map) > 0:
-                    # Fallback to first matching cell
-                    first_match = list(cell_map.values())[min(idx - 1, len(cell_map) - 1)] if idx > 0 else list(cell_map.values())[0]
-                    citation["doc_id"] = first_match.doc_id
-                    citation["doc_name"] = first_match.doc_name
-                    citation["metric_id"] = first_match.metric_id
-                    citation["metric_label"] = first_match.metric_label
-                    citation["value"] = first_match.cell.value if first_match.cell else ""
-        
-        elif citation.get("type") == "document":
-            idx = citation.get("index", 0)
-            doc_id = citation.get("doc_id", "")
+            if (not doc_id or doc_id == "..." or len(doc_id) < 5) and cell_map:
+                # cell_map is keyed 1..n, so an out-of-range index falls
+                # back to the nearest end
+                match = cell_map.get(idx) or cell_map[min(max(idx, 1), len(cell_map))]
+                citation = dict(c)  # Copy to avoid mutation
+                citation["doc_id"] = match.doc_id
+                citation["doc_name"] = match.doc_name
+                citation["metric_id"] = match.metric_id
+                citation["metric_label"] = match.metric_label
+                citation["value"] = match.cell.value if match.cell else ""
+        
+        elif c.get("type") == "document":
+            idx = c.get("index", 0)
+            doc_id = c.get("doc_id", "")
             
             # If doc_id looks like a placeholder, try to get from doc_map
-            if not doc_id or doc_id == "..." or len(doc_id) < 5:
-                if idx in doc_map:
-                    chunk = doc_map[idx]
-                    citation["doc_id"] = chunk.doc_id
-                    citation["doc_name"] = chunk.doc_name
-                    citation["section"] = chunk.section
-                    citation["excerpt"] = chunk.content[:] if chunk.content else ""
-                elif len(doc_map) > 0:
-                    # Fallback to first doc
-                    first_chunk = list(doc_map.values())[min(idx - 1, len(doc_map) - 1)] if idx > 0 else list(doc_map.values())[0]
-                    citation["doc_id"] = first_chunk.doc_id
-                    citation["doc_name"] = first_chunk.doc_name
-                    citation["section"] = first_chunk.section
-                    citation["excerpt"] = first_chunk.content[:] if first_chunk.content else ""
-        
-        enriched.append(citation)
+            if (not doc_id or doc_id == "..." or len(doc_id) < 5) and doc_map:
+                chunk = doc_map.get(idx) or doc_map[min(max(idx, 1), len(doc_map))]
+                citation = dict(c)  # Copy to avoid mutation
+                citation["doc_id"] = chunk.doc_id
+                citation["doc_name"] = chunk.doc_name
+                citation["section"] = chunk.section
+                citation["excerpt"] = (chunk.content or "")[:_MAX_EXCERPT]
+        
+        enriched[i] = citation
     
     return enriched
 
@@ -324,19 +380,19 @@ def _clean_citation_leakage(content: str) -> str:
     
     This function cleans these up to simple [n] format.
     """
-    # Pattern to match [Doc N] or [Cell N] with optional parenthetical metadata
-    # Examples: "[Doc 1] (doc_id=N_6F03AD)", "[Cell 2] (doc_id=xxx, metric_id=yyy)"
-    pattern = r'\[(Doc|Cell)\s*(\d+)\]\s*\([^)]*\)'
-    content = re.sub(pattern, r'[\2]', content)
-    
-    # Also clean up partial leakage like "[Doc 1]" without parentheses (should be [1])
-    pattern2 = r'\[(Doc|Cell)\s*(\d+)\]'
-    content = re.sub(pattern2, r'[\2]', content)
+    # Nothing to clean on citation-free turns; skip the regex engine
+    if "[" not in content and "(doc_id=" not in content:
+        return content
     
-    # Clean up any remaining (doc_id=...) or (doc_id=..., metric_id=...) that got separated
-    content = re.sub(r'\s*\(doc_id=[^)]*\)', '', content)
-    
-    return content
+    # One pass: "[Doc N] (...)" and "[Doc N]" become "[N]", while any
+    # separated (doc_id=...) or (doc_id=..., metric_id=...) is dropped
+    return _CITATION_LEAKAGE_PATTERN.sub(_replace_citation_leakage, content)
+
+
+def _replace_citation_leakage(match: re.Match) -> str:
+    """Replacement for _CITATION_LEAKAGE_PATTERN matches."""
+    index = match.group(2)
+    return f"[{index}]" if index else ""
 
 
 def _normalize_citations(content: str, raw_citations: List[dict]) -> tuple[str, List[Citation]]:
@@ -353,15 +409,8 @@ def _normalize_citations(content: str, raw_citations: List[dict]) -> tuple[str,
     # First, clean up any leaked citation metadata
     content = _clean_citation_leakage(content)
     
-    # Find all [n] references in the text, in order of appearance
-    ref_pattern = r'\[(\d+)\]'
-    refs_in_text = re.findall(ref_pattern, content)
-    unique_refs = []
-    for ref in refs_in_text:
-        if ref not in unique_refs:
-            unique_refs.append(ref)
-    
-    if not unique_refs or not raw_citations:
+    # No [n] references possible without a bracket
+    if "[" not in content or not raw_citations:
         return content, _parse_citations(raw_citations)
     
     # Build a mapping from old index to citation data
@@ -371,63 +420,87 @@ def _normalize_citations(content: str, raw_citations: List[dict]) -> tuple[str,
         if idx is not None:
             citation_by_index[str(idx)] = c
     
-    # Also keep citations in order as fallback
-    citations_in_order = list(raw_citations)
-    
-    # Create new normalized citations and replacement map
+    # Create new normalized citations and rewrite the [n] references in a
+    # single pass. Each distinct reference gets the next index in order of
+    # first appearance; references with no citation are left as written.
     normalized_citations = []
-    old_to_new = {}  # Maps old ref number to new index
+    old_to_new = {}  # Maps old ref number to new index (None if unmapped)
+    parts = []
+    pos = 0
     
-    for new_index, old_ref in enumerate(unique_refs, start=1):
-        # Try to find matching citation by index
-        citation_data = citation_by_index.get(old_ref)
-        
-        # Fallback: use citation by order of appearance
-        if citation_data is None and len(citations_in_order) >= new_index:
-            citation_data = citations_in_order[new_index - 1]
-        
-        if citation_data is None:
-            # No citation found for this reference - skip
-            continue
-        
-        old_to_new[old_ref] = new_index
-        
-        # Create the citation with the new index
-        try:
-            if citation_data.get("type") == "cell":
-                normalized_citations.append(CellCitation(
-                    index=new_index,
-                    doc_id=citation_data.get("doc_id", ""),
-                    doc_name=citation_data.get("doc_name", "Unknown"),
-                    metric_id=citation_data.get("metric_id", ""),
-                    metric_label=citation_data.get("metric_label", "Unknown"),
-                    value=citation_data.get("value", "")
-                ))
-            elif citation_data.get("type") == "document":
-                normalized_citations.append(DocumentCitation(
-                    index=new_index,
-                    doc_id=citation_data.get("doc_id", ""),
-                    doc_name=citation_data.get("doc_name", "Unknown"),
-                    section=citation_data.get("section"),
-                    page=citation_data.get("page"),
-                    excerpt=citation_data.get("excerpt", "")
-                ))
-        except Exception:
-            continue
-    
-    # Replace references in text with new indices
-    def replace_ref(match):
+    for match in _CITATION_REF_PATTERN.finditer(content):
         old_ref = match.group(1)
-        new_idx = old_to_new.get(old_ref)
+        if old_ref not in old_to_new:
+            new_index = len(old_to_new) + 1
+            old_to_new[old_ref] = _add_normalized_citation(
+                normalized_citations, new_index, old_ref, citation_by_index, raw_citations
+            )
+        new_idx = old_to_new[old_ref]
         if new_idx is not None:
-            return f"[{new_idx}]"
-        return match.group(0)  # Keep original if no mapping
+            parts.append(content[pos:match.start()])
+            parts.append(f"[{new_idx}]")
+            pos = match.end()
+    
+    if not old_to_new:
+        return content, _parse_citations(raw_citations)
     
-    normalized_content = re.sub(ref_pattern, replace_ref, content)
+    parts.append(content[pos:])
+    normalized_content = "".join(parts)
     
     return normalized_content, normalized_citations
 
 
+def _add_normalized_citation(
+    normalized_citations: List[Citation],
+    new_index: int,
+    old_ref: str,
+    citation_by_index: Dict[str, dict],
+    raw_citations: List[dict],
+) -> Optional[int]:
+    """
+    Find the citation for a [n] reference and append it with its new index.
+    
+    Returns:
+        The new index to write in place of the reference, or None if no
+        citation matches it
+    """
+    # Try to find matching citation by index
+    citation_data = citation_by_index.get(old_ref)
+    
+    # Fallback: use citation by order of appearance
+    if citation_data is None and len(raw_citations) >= new_index:
+        citation_data = raw_citations[new_index - 1]
+    
+    if citation_data is None:
+        # No citation found for this reference - skip
+        return None
+    
+    # Create the citation with the new index
+    try:
+        if citation_data.get("type") == "cell":
+            normalized_citations.append(CellCitation(
+                index=new_index,
+                doc_id=citation_data.get("doc_id", ""),
+                doc_name=citation_data.get("doc_name", "Unknown"),
+                metric_id=citation_data.get("metric_id", ""),
+                metric_label=citation_data.get("metric_label", "Unknown"),
+                value=citation_data.get("value", "")
+            ))
+        elif citation_data.get("type") == "document":
+            normalized_citations.append(DocumentCitation(
+                index=new_index,
+                doc_id=citation_data.get("doc_id", ""),
+                doc_name=citation_data.get("doc_name", "Unknown"),
+                section=citation_data.get("section"),
+                page=citation_data.get("page"),
+                excerpt=citation_data.get("excerpt", "")
+            ))
+    except Exception:
+        pass
+    
+    return new_index
+
+
 def _parse_citations(raw_citations: List[dict]) -> List[Citation]:
     """Parse raw citation dicts into typed Citation objects."""
     citations = []
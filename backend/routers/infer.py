@@ -2,9 +2,6 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 
-import sys
-sys.path.append("..")
-
 from services.llm_service import llm_service
 
 router = APIRouter(prefix="/api", tags=["inference"])
@@ -1,16 +1,23 @@
 """Reservoir API router - Document vault/substrate for all thinking modes."""
+import asyncio
 import hashlib
+import os
 import uuid
-from typing import Annotated, List, Optional
+from typing import Annotated, AsyncGenerator, BinaryIO, List, Optional, Union
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-import fitz  # PyMuPDF
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
 from auth.dependencies import get_required_user
-from database.base import get_db
+from database.base import AsyncSessionLocal, get_async_db, uuid7
 from database.models import ReservoirDocument
+from helpers.pdf import extract_pdf_text
+from helpers.text import decode_text
 from models.auth import CurrentUser
 from core.logfire_config import logger
 
@@ -55,24 +62,29 @@ class IngestResponse(BaseModel):
     message: str
 
 
+# Columns a document detail response needs besides extracted_text
+DETAIL_COLUMNS = [
+    ReservoirDocument.name,
+    ReservoirDocument.original_filename,
+    ReservoirDocument.file_type,
+    ReservoirDocument.file_size,
+    ReservoirDocument.file_size_bytes,
+    ReservoirDocument.is_processed,
+    ReservoirDocument.created_at,
+]
+
+# Characters of extracted text sent per streamed slice
+CONTENT_CHUNK_CHARS = 256 * 1024
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+def extract_text_from_pdf(file_bytes: bytes, content_hash: Optional[str] = None) -> str:
     """Extract text from PDF using PyMuPDF."""
     try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text_parts = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            if text.strip():
-                text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
-        
-        doc.close()
-        return "\n\n".join(text_parts)
+        return extract_pdf_text(file_bytes, content_hash)
     except Exception as e:
         logger.error(f"Failed to parse PDF: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Failed to parse PDF: {str(e)}")
@@ -87,9 +99,68 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} TB"
 
 
-def compute_content_hash(content: bytes) -> str:
-    """Compute SHA-256 hash for deduplication."""
-    return hashlib.sha256(content).hexdigest()
+# Read size for streaming uploads through the hash
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files from one ingest-multiple request processed at once; each holds a
+# database connection while its text is extracted
+INGEST_CONCURRENCY = 4
+
+# Leading bytes covered by the quick dedup hash
+QUICK_HASH_PREFIX_SIZE = 64 * 1024
+
+
+def compute_quick_hash(prefix: bytes, size_bytes: int) -> str:
+    """
+    Compute a quick dedup key from the file size and its first bytes.
+    Files with different quick hashes can't be identical, so the full
+    content hash is only needed when an existing document shares it.
+    """
+    hasher = hashlib.sha256(str(size_bytes).encode())
+    hasher.update(b"\0")
+    hasher.update(prefix)
+    return hasher.hexdigest()
+
+
+def compute_content_hash(fileobj: BinaryIO) -> str:
+    """
+    Compute SHA-256 hash for deduplication.
+    Streams the file in chunks instead of loading it into memory.
+    """
+    hasher = hashlib.sha256()
+    while chunk := fileobj.read(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def find_duplicate(
+    db: AsyncSession, user_id: uuid.UUID, content_hash: str
+) -> Optional[IngestResponse]:
+    """Return the ingest response for an existing copy of a file, if any."""
+    existing = (await db.execute(
+        select(
+            ReservoirDocument.id,
+            ReservoirDocument.name,
+            ReservoirDocument.file_type,
+            ReservoirDocument.file_size,
+            ReservoirDocument.is_processed,
+        ).where(
+            ReservoirDocument.user_id == user_id,
+            ReservoirDocument.content_hash == content_hash
+        ).limit(1)
+    )).first()
+    
+    if not existing:
+        return None
+    
+    return IngestResponse(
+        id=str(existing.id),
+        name=existing.name,
+        file_type=existing.file_type,
+        file_size=existing.file_size or "",
+        is_processed=existing.is_processed,
+        message="Document already exists in Reservoir"
+    )
 
 
 # ============================================================================
@@ -99,16 +170,28 @@ def compute_content_hash(content: bytes) -> str:
 @router.get("", response_model=ReservoirListResponse)
 async def list_documents(
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     List all documents in the user's Reservoir.
     
     Returns documents sorted by creation date (newest first).
     """
-    documents = db.query(ReservoirDocument).filter(
-        ReservoirDocument.user_id == current_user.id
-    ).order_by(ReservoirDocument.created_at.desc()).all()
+    # Select only the listed columns; extracted_text can be megabytes per row
+    documents = (await db.execute(
+        select(
+            ReservoirDocument.id,
+            ReservoirDocument.name,
+            ReservoirDocument.original_filename,
+            ReservoirDocument.file_type,
+            ReservoirDocument.file_size,
+            ReservoirDocument.file_size_bytes,
+            ReservoirDocument.is_processed,
+            ReservoirDocument.created_at,
+        )
+        .where(ReservoirDocument.user_id == current_user.id)
+        .order_by(ReservoirDocument.created_at.desc())
+    )).all()
     
     return ReservoirListResponse(
         documents=[
@@ -132,20 +215,30 @@ async def list_documents(
 async def get_document(
     document_id: str,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    include_text: bool = Query(True),
 ):
     """
     Get a specific document from the Reservoir with its extracted content.
+    
+    Args:
+        include_text: If False, only metadata is loaded and extracted_text
+            is null; fetch the text from /{document_id}/content instead
     """
     try:
         doc_uuid = uuid.UUID(document_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid document ID format")
     
-    doc = db.query(ReservoirDocument).filter(
-        ReservoirDocument.id == doc_uuid,
-        ReservoirDocument.user_id == current_user.id
-    ).first()
+    columns = [*DETAIL_COLUMNS, ReservoirDocument.extracted_text] if include_text else DETAIL_COLUMNS
+    doc = (await db.scalars(
+        select(ReservoirDocument)
+        .options(load_only(*columns))
+        .where(
+            ReservoirDocument.id == doc_uuid,
+            ReservoirDocument.user_id == current_user.id
+        ).limit(1)
+    )).first()
     
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -159,47 +252,101 @@ async def get_document(
         file_size_bytes=doc.file_size_bytes,
         is_processed=doc.is_processed,
         created_at=doc.created_at.isoformat() if doc.created_at else "",
-        extracted_text=doc.extracted_text,
+        extracted_text=doc.extracted_text if include_text else None,
     )
 
 
-@router.post("/ingest", response_model=IngestResponse)
-async def ingest_document(
+@router.get("/{document_id}/content")
+async def get_document_content(
+    document_id: str,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
-    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    Ingest a document into the Reservoir.
+    Stream a document's extracted text as plain text.
+    The text is loaded with one query and sent in slices, so the response
+    body isn't built as one large string.
+    """
+    try:
+        doc_uuid = uuid.UUID(document_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid document ID format")
     
-    Extracts text content from PDFs and text files.
-    Deduplicates based on content hash.
+    row = (await db.execute(
+        select(ReservoirDocument.extracted_text).where(
+            ReservoirDocument.id == doc_uuid,
+            ReservoirDocument.user_id == current_user.id
+        ).limit(1)
+    )).first()
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    text = row[0] or ""
+    
+    async def stream_text() -> AsyncGenerator[str, None]:
+        for start in range(0, len(text), CONTENT_CHUNK_CHARS):
+            yield text[start:start + CONTENT_CHUNK_CHARS]
+    
+    return StreamingResponse(stream_text(), media_type="text/plain; charset=utf-8")
+
+
+async def prepare_document(
+    current_user: CurrentUser, db: AsyncSession, file: UploadFile
+) -> Union[ReservoirDocument, IngestResponse]:
+    """
+    Dedup an uploaded file and extract its text, without storing it.
+    
+    Args:
+        current_user: The uploading user
+        db: Session for the duplicate lookups
+        file: The uploaded file
+        
+    Returns:
+        The response for an existing copy if the file is a duplicate,
+        otherwise a new, unsaved ReservoirDocument
     """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
     
+    # Quick dedup key from the size and first 64 KB of the spooled upload
+    file_size_bytes = file.file.seek(0, os.SEEK_END)
+    await file.seek(0)
+    quick_hash = compute_quick_hash(
+        await file.read(QUICK_HASH_PREFIX_SIZE), file_size_bytes
+    )
+    
+    # Only hash the whole file when an existing document could match it.
+    # Documents stored before quick hashes existed are always candidates.
+    content_hash = None
+    candidate = (await db.scalars(
+        select(ReservoirDocument.id).where(
+            ReservoirDocument.user_id == current_user.id,
+            or_(
+                ReservoirDocument.quick_hash == quick_hash,
+                ReservoirDocument.quick_hash.is_(None),
+            )
+        ).limit(1)
+    )).first()
+    
+    if candidate is not None:
+        # Stream the full hash from the spooled upload in a worker thread;
+        # duplicates are never read into memory
+        await file.seek(0)
+        content_hash = await asyncio.to_thread(compute_content_hash, file.file)
+        
+        # Check for duplicate
+        duplicate = await find_duplicate(db, current_user.id, content_hash)
+        if duplicate:
+            return duplicate
+    
     # Read file content
+    await file.seek(0)
     file_bytes = await file.read()
-    file_size_bytes = len(file_bytes)
-    
-    # Compute hash for deduplication
-    content_hash = compute_content_hash(file_bytes)
-    
-    # Check for duplicate
-    existing = db.query(ReservoirDocument).filter(
-        ReservoirDocument.user_id == current_user.id,
-        ReservoirDocument.content_hash == content_hash
-    ).first()
-    
-    if existing:
-        return IngestResponse(
-            id=str(existing.id),
-            name=existing.name,
-            file_type=existing.file_type,
-            file_size=existing.file_size or "",
-            is_processed=existing.is_processed,
-            message="Document already exists in Reservoir"
-        )
+    
+    if content_hash is None:
+        # New file: hash the bytes already in memory instead of re-reading
+        content_hash = (await asyncio.to_thread(hashlib.sha256, file_bytes)).hexdigest()
     
     # Determine file type
     content_type = file.content_type or ""
@@ -221,27 +368,26 @@ async def ingest_document(
     
     try:
         if file_type == "pdf":
-            extracted_text = extract_text_from_pdf(file_bytes)
+            extracted_text = await asyncio.to_thread(
+                extract_text_from_pdf, file_bytes, content_hash
+            )
             is_processed = True
         elif file_type in ["txt", "md"]:
-            try:
-                extracted_text = file_bytes.decode("utf-8")
-            except UnicodeDecodeError:
-                extracted_text = file_bytes.decode("latin-1")
+            extracted_text = decode_text(file_bytes, fallback="latin-1")
             is_processed = True
         else:
             # Try to decode as text
             try:
-                extracted_text = file_bytes.decode("utf-8")
+                extracted_text = decode_text(file_bytes)
                 is_processed = True
             except:
                 processing_error = "Could not extract text from file"
     except Exception as e:
         processing_error = str(e)
     
-    # Create document record
+    # Create document record (stored by the caller)
     doc = ReservoirDocument(
-        id=uuid.uuid4(),
+        id=uuid7(),
         user_id=current_user.id,
         name=file.filename,
         original_filename=file.filename,
@@ -249,17 +395,34 @@ async def ingest_document(
         file_size=format_file_size(file_size_bytes),
         file_size_bytes=str(file_size_bytes),
         content_hash=content_hash,
+        quick_hash=quick_hash,
         extracted_text=extracted_text,
         is_processed=is_processed,
         processing_error=processing_error,
     )
-    
+    return doc
+
+
+async def store_document(db: AsyncSession, doc: ReservoirDocument) -> IngestResponse:
+    """Store a prepared document and build its ingest response."""
     db.add(doc)
-    db.commit()
-    db.refresh(doc)
-    
-    logger.info(f"Document ingested into Reservoir: {doc.name} (user: {current_user.id})")
+    try:
+        await db.commit()
+    except IntegrityError:
+        # The same file was ingested concurrently and the unique
+        # (user_id, content_hash) index kept the other copy
+        await db.rollback()
+        duplicate = await find_duplicate(db, doc.user_id, doc.content_hash)
+        if duplicate:
+            return duplicate
+        raise
     
+    logger.info(f"Document ingested into Reservoir: {doc.name} (user: {doc.user_id})")
+    return ingested_response(doc)
+
+
+def ingested_response(doc: ReservoirDocument) -> IngestResponse:
+    """Build the ingest response for a newly stored document."""
     return IngestResponse(
         id=str(doc.id),
         name=doc.name,
@@ -270,30 +433,101 @@ async def ingest_document(
     )
 
 
+def failed_result(filename: Optional[str], detail: str) -> dict:
+    """Build the per-file result for a file that couldn't be ingested."""
+    return {
+        "id": None,
+        "name": filename,
+        "file_type": None,
+        "file_size": None,
+        "is_processed": False,
+        "message": f"Error: {detail}"
+    }
+
+
+@router.post("/ingest", response_model=IngestResponse)
+async def ingest_document(
+    current_user: Annotated[CurrentUser, Depends(get_required_user)],
+    db: AsyncSession = Depends(get_async_db),
+    file: UploadFile = File(...),
+):
+    """
+    Ingest a document into the Reservoir.
+    
+    Extracts text content from PDFs and text files.
+    Deduplicates based on content hash.
+    """
+    prepared = await prepare_document(current_user, db, file)
+    if isinstance(prepared, IngestResponse):
+        return prepared
+    return await store_document(db, prepared)
+
+
 @router.post("/ingest-multiple")
 async def ingest_multiple_documents(
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     files: List[UploadFile] = File(...),
 ):
     """
     Ingest multiple documents into the Reservoir.
+    Files are deduplicated and extracted concurrently, then all new
+    documents are stored in one transaction.
     """
-    results = []
+    limit = asyncio.Semaphore(INGEST_CONCURRENCY)
+    
+    async def prepare_one(file: UploadFile) -> Union[ReservoirDocument, IngestResponse, dict]:
+        # One AsyncSession can't be shared by concurrent tasks, so each
+        # file's duplicate lookups get their own
+        async with limit, AsyncSessionLocal() as file_db:
+            try:
+                return await prepare_document(current_user, file_db, file)
+            except HTTPException as e:
+                return failed_result(file.filename, e.detail)
     
-    for file in files:
+    prepared = await asyncio.gather(*(prepare_one(file) for file in files))
+    
+    # A file repeated within the batch is stored once
+    new_docs: dict[str, ReservoirDocument] = {}
+    for item in prepared:
+        if isinstance(item, ReservoirDocument):
+            new_docs.setdefault(item.content_hash, item)
+    
+    stored: dict[str, Union[IngestResponse, dict]] = {}
+    if new_docs:
+        db.add_all(new_docs.values())
         try:
-            result = await ingest_document(current_user, db, file)
-            results.append(result.model_dump())
-        except HTTPException as e:
-            results.append({
-                "id": None,
-                "name": file.filename,
-                "file_type": None,
-                "file_size": None,
-                "is_processed": False,
-                "message": f"Error: {e.detail}"
-            })
+            await db.commit()
+            for content_hash, doc in new_docs.items():
+                stored[content_hash] = ingested_response(doc)
+            logger.info(f"{len(new_docs)} documents ingested into Reservoir (user: {current_user.id})")
+        except IntegrityError:
+            # Another request stored one of these files meanwhile; store
+            # them one at a time so the rest still go in
+            await db.rollback()
+            for content_hash, doc in new_docs.items():
+                try:
+                    stored[content_hash] = await store_document(db, doc)
+                except Exception as e:
+                    await db.rollback()
+                    logger.error(f"Failed to store Reservoir document {doc.name}: {e}")
+                    stored[content_hash] = failed_result(doc.name, "Could not store document")
+    
+    results = []
+    for item in prepared:
+        if isinstance(item, dict):
+            results.append(item)
+        elif isinstance(item, IngestResponse):
+            results.append(item.model_dump())
+        elif isinstance(stored[item.content_hash], dict):
+            # Storing the batch's copy of this file failed
+            results.append(failed_result(item.name, "Could not store document"))
+        elif new_docs[item.content_hash] is item:
+            results.append(stored[item.content_hash].model_dump())
+        else:
+            results.append(stored[item.content_hash].model_copy(
+                update={"message": "Document already exists in Reservoir"}
+            ).model_dump())
     
     return {
         "documents": results,
@@ -306,7 +540,7 @@ async def ingest_multiple_documents(
 async def delete_document(
     document_id: str,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Delete a document from the Reservoir.
@@ -316,16 +550,18 @@ async def delete_document(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid document ID format")
     
-    doc = db.query(ReservoirDocument).filter(
-        ReservoirDocument.id == doc_uuid,
-        ReservoirDocument.user_id == current_user.id
-    ).first()
+    doc = (await db.scalars(
+        select(ReservoirDocument).where(
+            ReservoirDocument.id == doc_uuid,
+            ReservoirDocument.user_id == current_user.id
+        ).limit(1)
+    )).first()
     
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    db.delete(doc)
-    db.commit()
+    await db.delete(doc)
+    await db.commit()
     
     logger.info(f"Document deleted from Reservoir: {doc.name} (user: {current_user.id})")
     
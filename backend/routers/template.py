@@ -1,14 +1,15 @@
 """
 Template router for managing analysis templates.
 """
+import threading
 from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.base import get_db
+from database.base import get_async_db
 from database.crud import template_crud
 from auth.dependencies import get_current_user, get_required_user
 from models.auth import CurrentUser
@@ -75,7 +76,8 @@ def template_to_response(template) -> TemplateResponse:
         name=template.name,
         subtitle=template.subtitle,
         description=template.description,
-        metrics=[MetricModel(**m) for m in (template.metrics or [])],
+        # Summary rows carry no metrics column
+        metrics=[MetricModel(**m) for m in (getattr(template, "metrics", None) or [])],
         user_id=str(template.user_id) if template.user_id else None,
         is_system=template.is_system,
         forked_from_id=str(template.forked_from_id) if template.forked_from_id else None,
@@ -84,21 +86,57 @@ def template_to_response(template) -> TemplateResponse:
     )
 
 
+# System templates are read-only, so their responses are reused across list
+# calls. updated_at is part of the key, so a re-seeded template misses.
+_SYSTEM_RESPONSE_CACHE_SIZE = 256
+_system_responses: dict[tuple, TemplateResponse] = {}
+_system_responses_lock = threading.Lock()
+
+
+def list_item_response(template) -> TemplateResponse:
+    """
+    Convert a listed template to a TemplateResponse, reusing the cached
+    response for unchanged system templates.
+    """
+    if not template.is_system:
+        return template_to_response(template)
+
+    # Summary rows have no metrics attribute and get a separate entry
+    key = (template.id, template.updated_at, hasattr(template, "metrics"))
+    with _system_responses_lock:
+        response = _system_responses.get(key)
+    if response is None:
+        response = template_to_response(template)
+        with _system_responses_lock:
+            if len(_system_responses) >= _SYSTEM_RESPONSE_CACHE_SIZE:
+                # Evict the oldest entry (dicts preserve insertion order)
+                _system_responses.pop(next(iter(_system_responses)))
+            _system_responses[key] = response
+    return response
+
+
 # ============= Endpoints =============
 
 @router.get("", response_model=TemplateListResponse)
 async def list_templates(
     current_user: Annotated[Optional[CurrentUser], Depends(get_current_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    include_metrics: bool = Query(True),
 ):
     """
     List all available templates.
     Returns system templates + user's own templates (if authenticated).
+
+    Args:
+        include_metrics: If False, skip loading metrics and return them empty
     """
     user_id = current_user.id if current_user else None
-    templates = template_crud.get_all_for_user(db, user_id=user_id)
+    if include_metrics:
+        templates = await template_crud.get_all_for_user(db, user_id=user_id)
+    else:
+        templates = await template_crud.get_summaries_for_user(db, user_id=user_id)
     return TemplateListResponse(
-        templates=[template_to_response(t) for t in templates]
+        templates=[list_item_response(t) for t in templates]
     )
 
 
@@ -106,13 +144,13 @@ async def list_templates(
 async def get_template(
     template_id: UUID,
     current_user: Annotated[Optional[CurrentUser], Depends(get_current_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get a single template by ID.
     Returns template if it's a system template or owned by the user.
     """
-    template = template_crud.get(db, id=template_id)
+    template = await template_crud.get(db, id=template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -134,13 +172,13 @@ async def get_template(
 async def create_template(
     request: TemplateCreateRequest,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new user-owned template.
     Requires authentication.
     """
-    template = template_crud.create(
+    template = await template_crud.create(
         db,
         name=request.name,
         user_id=current_user.id,
@@ -156,7 +194,7 @@ async def fork_template(
     template_id: UUID,
     request: TemplateForkRequest,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Fork (clone) an existing template.
@@ -164,7 +202,7 @@ async def fork_template(
     Requires authentication.
     """
     # Verify source template exists and is accessible
-    source = template_crud.get(db, id=template_id)
+    source = await template_crud.get(db, id=template_id)
     if not source:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -179,7 +217,7 @@ async def fork_template(
                 detail="Not authorized to fork this template"
             )
     
-    forked = template_crud.fork(
+    forked = await template_crud.fork(
         db,
         template_id=template_id,
         user_id=current_user.id,
@@ -200,14 +238,14 @@ async def update_template(
     template_id: UUID,
     request: TemplateUpdateRequest,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update a template.
     Only the owner can update their templates.
     System templates cannot be modified.
     """
-    template = template_crud.get(db, id=template_id)
+    template = await template_crud.get(db, id=template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -220,7 +258,7 @@ async def update_template(
             detail="Not authorized to modify this template"
         )
     
-    updated = template_crud.update(
+    updated = await template_crud.update(
         db,
         db_obj=template,
         name=request.name,
@@ -236,14 +274,14 @@ async def update_template(
 async def delete_template(
     template_id: UUID,
     current_user: Annotated[CurrentUser, Depends(get_required_user)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Delete a template.
     Only the owner can delete their templates.
     System templates cannot be deleted.
     """
-    template = template_crud.get(db, id=template_id)
+    template = await template_crud.get(db, id=template_id)
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -256,7 +294,7 @@ async def delete_template(
             detail="Not authorized to delete this template"
         )
     
-    deleted = template_crud.delete(db, db_obj=template)
+    deleted = await template_crud.delete(db, db_obj=template)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,8 +1,11 @@
 """File upload router with PDF text extraction using PyMuPDF."""
+import asyncio
 import uuid
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pydantic import BaseModel
-import fitz  # PyMuPDF
+
+from helpers.pdf import extract_pdf_text
+from helpers.text import decode_text
 
 
 router = APIRouter(prefix="/api", tags=["upload"])
@@ -19,17 +22,7 @@ class UploadResponse(BaseModel):
 def extract_text_from_pdf(file_bytes: bytes) -> str:
     """Extract text from PDF using PyMuPDF."""
     try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text_parts = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
-            if text.strip():
-                text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
-        
-        doc.close()
-        return "\n\n".join(text_parts)
+        return extract_pdf_text(file_bytes)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse PDF: {str(e)}")
 
@@ -53,20 +46,18 @@ async def upload_document(file: UploadFile = File(...)):
     
     # Extract text based on file type
     if content_type == "application/pdf" or filename_lower.endswith(".pdf"):
-        content = extract_text_from_pdf(file_bytes)
+        # PDF parsing is CPU-bound; keep it off the event loop
+        content = await asyncio.to_thread(extract_text_from_pdf, file_bytes)
     elif content_type.startswith("text/") or filename_lower.endswith((".txt", ".csv", ".json", ".md", ".xml")):
         # Text-based files - decode directly
         try:
-            content = file_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            try:
-                content = file_bytes.decode("latin-1")
-            except:
-                raise HTTPException(status_code=400, detail="Could not decode text file")
+            content = decode_text(file_bytes, fallback="latin-1")
+        except:
+            raise HTTPException(status_code=400, detail="Could not decode text file")
     else:
         # Try to decode as text, fall back to error
         try:
-            content = file_bytes.decode("utf-8")
+            content = decode_text(file_bytes)
         except:
             raise HTTPException(
                 status_code=400, 
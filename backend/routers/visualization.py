@@ -2,9 +2,6 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 
-import sys
-sys.path.append("..")
-
 from services.visualization import visualization_service
 from services.analytical_questions import analytical_questions_service
 from core.logfire_config import log_error, log_info, log_warning
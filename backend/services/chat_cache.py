@@ -0,0 +1,69 @@
+"""
+In-process TTL cache for chat LLM responses.
+Repeated questions against the same matrix/document context and history
+reuse the earlier LLM answer instead of making another round trip.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class ChatResponseCache:
+    """Simple TTL cache of LLM chat responses keyed by query and context."""
+
+    def __init__(self, ttl_seconds: int = 300, max_size: int = 1_000):
+        # key -> (llm response, cached_at)
+        self._cache: Dict[str, Tuple[dict, float]] = {}
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def make_key(
+        self,
+        query: str,
+        matrix_context: str,
+        document_context: str,
+        chat_history: str,
+    ) -> str:
+        """
+        Create a cache key from the normalized query and the exact context
+        sent to the LLM. Case and whitespace differences in the query are
+        ignored; any change in context produces a different key.
+        """
+        normalized_query = " ".join(query.lower().split())
+        digest = hashlib.sha256()
+        for part in (normalized_query, matrix_context, document_context, chat_history):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get a cached response if it exists and has not expired."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            response, cached_at = entry
+            if time.monotonic() - cached_at >= self._ttl:
+                # Expired, remove it
+                del self._cache[key]
+                return None
+            return response
+
+    def set(self, key: str, response: dict) -> None:
+        """Cache an LLM response (must contain "response" and "citations")."""
+        with self._lock:
+            if len(self._cache) >= self._max_size and key not in self._cache:
+                # Evict the oldest entry (dicts preserve insertion order)
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = (response, time.monotonic())
+
+    def clear(self) -> None:
+        """Clear all cached responses."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global cache instance
+chat_response_cache = ChatResponseCache()
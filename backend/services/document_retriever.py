@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import re
+import threading
 from models.document import Document, DocChunk
 
 
@@ -9,6 +10,12 @@ class DocumentRetriever:
     def __init__(self, chunk_size: int = 2000, chunk_overlap: int = 200):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # Chunks per document, keyed by (id, name, content). The frontend
+        # resends the same documents on every chat turn, so re-chunking is
+        # skipped unless the content changed.
+        self._chunk_cache: Dict[Tuple[str, str, str], List[DocChunk]] = {}
+        self._chunk_cache_size = 64
+        self._chunk_cache_lock = threading.Lock()  # retrieve() runs in worker threads
     
     def _chunk_document(self, doc: Document) -> List[DocChunk]:
         """Split document into overlapping chunks."""
@@ -49,14 +56,28 @@ class DocumentRetriever:
         
         return chunks
     
+    def _get_chunks(self, doc: Document) -> List[DocChunk]:
+        """Get a document's chunks, from cache when its content is unchanged."""
+        key = (doc.id, doc.name, doc.content)
+        with self._chunk_cache_lock:
+            chunks = self._chunk_cache.get(key)
+        if chunks is None:
+            chunks = self._chunk_document(doc)
+            with self._chunk_cache_lock:
+                if len(self._chunk_cache) >= self._chunk_cache_size and key not in self._chunk_cache:
+                    # Evict the oldest entry (dicts preserve insertion order)
+                    self._chunk_cache.pop(next(iter(self._chunk_cache)))
+                self._chunk_cache[key] = chunks
+        return chunks
+    
     def _score_chunk_relevance(self, chunk: DocChunk, query_terms: List[str]) -> float:
-        """Score chunk relevance to query."""
+        """Score chunk relevance to query (query_terms are already lower-cased)."""
         content_lower = chunk.content.lower()
         score = 0.0
         
         for term in query_terms:
             # Count occurrences
-            count = content_lower.count(term.lower())
+            count = content_lower.count(term)
             if count > 0:
                 score += min(count * 0.2, 1.0)
         
@@ -64,7 +85,7 @@ class DocumentRetriever:
         if chunk.section:
             section_lower = chunk.section.lower()
             for term in query_terms:
-                if term.lower() in section_lower:
+                if term in section_lower:
                     score += 0.5
         
         return min(score, 1.0)
@@ -87,11 +108,11 @@ class DocumentRetriever:
         all_chunks: List[DocChunk] = []
         
         for doc in documents:
-            chunks = self._chunk_document(doc)
-            for chunk in chunks:
-                chunk.relevance_score = self._score_chunk_relevance(chunk, query_terms)
-                if chunk.relevance_score >= min_relevance:
-                    all_chunks.append(chunk)
+            for chunk in self._get_chunks(doc):
+                score = self._score_chunk_relevance(chunk, query_terms)
+                if score >= min_relevance:
+                    # Cached chunks are shared, so score a copy
+                    all_chunks.append(chunk.model_copy(update={"relevance_score": score}))
         
         # Sort by relevance and return top chunks
         all_chunks.sort(key=lambda c: c.relevance_score, reverse=True)
@@ -1,7 +1,8 @@
 """
 LLM Service Factory - Manages switching between OpenAI and Gemini providers.
 """
-from typing import Optional, List, AsyncGenerator
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, List, AsyncGenerator
 
 from core.config import settings
 from .openai_service import openai_service
@@ -15,6 +16,11 @@ class LLMService:
     def __init__(self):
         self.provider = settings.llm.llm_provider.lower()
         self._service = None
+        # Bounds concurrent extraction/inference calls so bursts don't hit
+        # provider rate limits
+        self._semaphore = asyncio.Semaphore(settings.llm.llm_concurrency)
+        # Identical calls already in flight, shared by later callers
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
     
     def _get_service(self):
         """Get the active LLM service based on provider setting."""
@@ -25,13 +31,51 @@ class LLMService:
                 self._service = openai_service
         return self._service
     
+    async def _limited(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a provider call under the concurrency limit."""
+        async with self._semaphore:
+            return await call()
+    
+    async def _single_flight(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a provider call under the concurrency limit, sharing the result
+        with identical calls that arrive while it is still in flight.
+        
+        Args:
+            key: Identifies identical calls (provider and inputs)
+            call: Starts the provider call
+            
+        Returns:
+            The provider call's result
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._limited(call))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting doesn't cancel it for the rest
+        return await asyncio.shield(task)
+    
     async def extract_metric(self, document_content: str, metric_label: str, on_step=None):
         """Extract a metric value from document content."""
-        return await self._get_service().extract_metric(document_content, metric_label, on_step)
+        service = self._get_service()
+        if on_step is not None:
+            # Progress callbacks are per caller, so don't share this call
+            return await self._limited(
+                lambda: service.extract_metric(document_content, metric_label, on_step)
+            )
+        return await self._single_flight(
+            ("extract", self.provider, document_content, metric_label),
+            lambda: service.extract_metric(document_content, metric_label, None),
+        )
     
     async def infer_metrics(self, doc_snippets: list[dict]) -> list[str]:
         """Infer schema metrics from document corpus."""
-        return await self._get_service().infer_metrics(doc_snippets)
+        service = self._get_service()
+        key = ("infer", self.provider) + tuple(
+            (s.get("name"), s.get("content")) for s in doc_snippets
+        )
+        return await self._single_flight(key, lambda: service.infer_metrics(doc_snippets))
     
     async def chat_with_context(
         self,
@@ -42,10 +42,10 @@ class MatrixRetriever:
         for term in query_terms:
             if term in label_lower:
                 score += 1.0
-            # Check semantic mappings
-            for concept, keywords in self.semantic_mappings.items():
-                if term == concept and any(kw in label_lower for kw in keywords):
-                    score += 0.8
+            # Check semantic mappings (only a concept term has keywords)
+            keywords = self.semantic_mappings.get(term)
+            if keywords and any(kw in label_lower for kw in keywords):
+                score += 0.8
         
         return min(score, 1.0)  # Cap at 1.0
     
@@ -65,28 +65,24 @@ class MatrixRetriever:
         query_terms = self._normalize_query(query)
         matches: List[CellMatch] = []
         
-        # Build doc lookup
-        doc_lookup = {doc.id: doc for doc in documents}
-        
         for metric in metrics:
             relevance = self._score_metric_relevance(metric.label, query_terms)
             
             if relevance >= min_relevance:
-                # Find all cells for this metric
-                for cell_key, cell in cells.items():
-                    if f"-{metric.id}" in cell_key and cell.value and cell.value != "—":
-                        doc_id = cell_key.split(f"-{metric.id}")[0]
-                        doc = doc_lookup.get(doc_id)
-                        
-                        if doc:
-                            matches.append(CellMatch(
-                                doc_id=doc_id,
-                                doc_name=doc.name,
-                                metric_id=metric.id,
-                                metric_label=metric.label,
-                                cell=cell,
-                                relevance_score=relevance
-                            ))
+                # Cells are keyed "docId-metricId", so look each one up
+                # directly instead of scanning every cell per metric
+                for doc in documents:
+                    cell = cells.get(f"{doc.id}-{metric.id}")
+                    if cell and cell.value and cell.value != "—":
+                        # Every field comes from already-validated models
+                        matches.append(CellMatch.model_construct(
+                            doc_id=doc.id,
+                            doc_name=doc.name,
+                            metric_id=metric.id,
+                            metric_label=metric.label,
+                            cell=cell,
+                            relevance_score=relevance
+                        ))
         
         # Sort by relevance
         matches.sort(key=lambda m: m.relevance_score, reverse=True)
@@ -3,7 +3,7 @@ from datetime import datetime
 import uuid
 
 from models.document import Document
-from models.matrix import CellData, Metric
+from models.matrix import CellData, MatrixContext, Metric
 from models.chat import ChatMessage
 
 
@@ -103,6 +103,10 @@ class StateStore:
             self._chat_history[session_id] = []
         self._chat_history[session_id].append(message)
     
+    def add_chat_messages(self, session_id: str, messages: List[ChatMessage]) -> None:
+        """Append several messages (e.g. a user turn and its reply) at once."""
+        self._chat_history.setdefault(session_id, []).extend(messages)
+    
     def get_chat_history(self, session_id: str, limit: int = 20) -> List[ChatMessage]:
         history = self._chat_history.get(session_id, [])
         return history[-limit:]
@@ -111,11 +115,15 @@ class StateStore:
         if session_id in self._chat_history:
             self._chat_history[session_id] = []
     
-    def sync_context(self, matrix_context: dict) -> None:
-        """Sync full matrix context from frontend."""
-        self.sync_documents(matrix_context.get("documents", []))
-        self.sync_metrics(matrix_context.get("metrics", []))
-        self.sync_cells(matrix_context.get("cells", {}))
+    def sync_context(self, matrix_context: MatrixContext) -> None:
+        """
+        Sync full matrix context from frontend.
+        Metrics and cells were already validated with the request body, so
+        they're stored as-is rather than rebuilt from dicts.
+        """
+        self.sync_documents(matrix_context.documents)
+        self._metrics = {metric.id: metric for metric in matrix_context.metrics}
+        self._cells = dict(matrix_context.cells)
 
 
 # Global store instance
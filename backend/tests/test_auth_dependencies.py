@@ -0,0 +1,112 @@
+"""
+The auth dependency chain must resolve the session token with one query per
+request, however many of get_current_user / get_required_user /
+get_admin_user a route depends on.
+"""
+import datetime
+import secrets
+from typing import Annotated, Optional
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from auth.constants import SESSION_COOKIE_NAME
+from auth.dependencies import get_admin_user, get_current_user, get_required_user
+from database.base import get_async_db
+from database.crud import _hash_token
+from database.models import Session as DBSession, User
+from models.auth import CurrentUser
+
+# Async SQLite driver for the test database
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """SQLite database with the users and sessions tables."""
+    path = tmp_path / "auth.db"
+    engine = create_engine(f"sqlite:///{path}")
+    User.__table__.create(engine)
+    DBSession.__table__.create(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def token(db_path):
+    """Raw session token for the admin user."""
+    token = secrets.token_urlsafe(32)
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as db:
+        user = User(
+            email="admin@example.com",
+            auth_provider="email",
+            provider_user_id="admin@example.com",
+            is_admin=True,
+        )
+        db.add(user)
+        db.flush()
+        db.add(DBSession(
+            user_id=user.id,
+            token=_hash_token(token),
+            expires_at=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1),
+        ))
+        db.commit()
+    engine.dispose()
+    return token
+
+
+@pytest.fixture
+def client_and_statements(db_path):
+    """Test client for a route using all three auth dependencies, plus the
+    list of SQL statements executed while serving it."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def get_test_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.dependency_overrides[get_async_db] = get_test_db
+
+    @app.get("/whoami")
+    async def whoami(
+        maybe_user: Annotated[Optional[CurrentUser], Depends(get_current_user)],
+        user: Annotated[CurrentUser, Depends(get_required_user)],
+        admin: Annotated[CurrentUser, Depends(get_admin_user)],
+    ):
+        return {"same": maybe_user.id == user.id == admin.id}
+
+    with TestClient(app) as client:
+        yield client, statements
+
+
+def test_session_resolved_with_one_query(client_and_statements, token):
+    client, statements = client_and_statements
+
+    client.cookies.set(SESSION_COOKIE_NAME, token)
+    response = client.get("/whoami")
+
+    assert response.status_code == 200
+    assert response.json() == {"same": True}
+    assert len(statements) == 1
+
+
+def test_anonymous_request_runs_no_query(client_and_statements):
+    client, statements = client_and_statements
+
+    response = client.get("/whoami")
+
+    assert response.status_code == 401
+    assert statements == []